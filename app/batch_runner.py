@@ -0,0 +1,125 @@
+import datetime
+import glob
+import json
+import os
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Set
+
+from app.streaming import NDJSON_EXTENSIONS, PDF_EXTENSIONS
+
+
+class BatchRunner:
+    """
+    Procesa varios extractos repartiendolos entre un pool de procesos.
+
+    Como mucho hay max_pending extractos encolados a la vez (cola acotada), de forma que un directorio con cientos de
+    extractos no dispara todas las tareas de golpe. Un extracto que falla se registra en el resumen sin abortar el
+    resto del lote.
+    """
+
+    def __init__(self, job: Callable[[str], Dict[str, Any]], workers: int = 1, max_pending: int = 0):
+        """
+        :param job: Funcion (a nivel de modulo, para poder enviarla a otros procesos) que procesa un extracto y
+        devuelve un diccionario con su resumen
+        :param workers: Numero de procesos
+        :param max_pending: Numero maximo de extractos encolados a la vez (por defecto, el doble de procesos)
+        """
+        self.job: Callable[[str], Dict[str, Any]] = job
+        self.workers: int = max(1, workers)
+        self.max_pending: int = max_pending if max_pending > 0 else self.workers * 2
+
+    @staticmethod
+    def resolve_inputs(source: str) -> List[str]:
+        """
+        Metodo que devuelve los extractos a procesar a partir de un directorio (todos sus .json, NDJSON y
+        .pdf, las mismas extensiones que lee app.streaming.iter_extract_rows) o de un patron glob
+        :param source:
+        :return:
+        """
+        if os.path.isdir(source):
+            extensions: tuple = (".json",) + NDJSON_EXTENSIONS + PDF_EXTENSIONS
+            return sorted(path for extension in extensions for path in glob.glob(os.path.join(source, f"*{extension}")))
+        return sorted(glob.glob(source))
+
+    def run(self, input_paths: List[str]) -> List[Dict[str, Any]]:
+        """
+        Metodo que procesa todos los extractos y devuelve el resumen de cada uno en el orden de entrada
+        :param input_paths:
+        :return:
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        pending: Dict[Future, str] = {}
+        queue: List[str] = list(input_paths)
+        queue.reverse()
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            while queue or pending:
+
+                # -- 1: Relleno la cola hasta el maximo de tareas pendientes
+                while queue and len(pending) < self.max_pending:
+                    input_path: str = queue.pop()
+                    pending[executor.submit(_timed_job, self.job, input_path)] = input_path
+
+                # -- 2: Espero a que termine al menos una y recojo su resultado
+                done: Set[Future] = wait(pending, return_when=FIRST_COMPLETED)[0]
+                for future in done:
+                    input_path = pending.pop(future)
+                    try:
+                        result: Dict[str, Any] = future.result()
+                    except Exception as e:
+                        # -- El proceso ha muerto o el resultado no se ha podido recibir
+                        result = {"input_path": input_path, "status": "error", "error": repr(e), "elapsed_seconds": None}
+                    results[input_path] = result
+                    print(f"[{result['status'].upper()}] {input_path}"
+                          + (f" ({result['elapsed_seconds']:.2f} s)" if result["elapsed_seconds"] is not None else "")
+                          + (f": {result['error']}" if result["status"] == "error" else ""))
+
+        return [results[input_path] for input_path in input_paths]
+
+    @staticmethod
+    def export_summary(results: List[Dict[str, Any]], output_dir: str) -> str:
+        """
+        Metodo que exporta el resumen combinado del lote (un registro por extracto y totales agregados)
+        :param results:
+        :param output_dir:
+        :return: Ruta del fichero generado
+        """
+        os.makedirs(output_dir, exist_ok=True)
+
+        ok_results: List[Dict[str, Any]] = [r for r in results if r["status"] == "ok"]
+        totals: Dict[str, float] = {
+            key: sum(r["totals"][key] for r in ok_results)
+            for key in ("total_gross_proffit", "total_net_proffit", "total_comissions", "total_taxes")
+        }
+        summary: Dict[str, Any] = {
+            "n_extracts": len(results),
+            "n_ok": len(ok_results),
+            "n_errors": len(results) - len(ok_results),
+            "elapsed_seconds": sum(r["elapsed_seconds"] or 0.0 for r in results),
+            "totals": totals,
+            "extracts": results
+        }
+
+        now_str: str = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        file_path: str = os.path.join(output_dir, f"resumen_lote_{now_str}.json")
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=4, ensure_ascii=False)
+
+        print(f"Resumen del lote exportado correctamente a: {file_path} "
+              f"({summary['n_ok']} correctos, {summary['n_errors']} con error)")
+        return file_path
+
+
+def _timed_job(job: Callable[[str], Dict[str, Any]], input_path: str) -> Dict[str, Any]:
+    """
+    Ejecuta el trabajo de un extracto midiendo su duracion y capturando cualquier error
+    """
+    start: float = time.perf_counter()
+    try:
+        result: Dict[str, Any] = {"input_path": input_path, "status": "ok", **job(input_path)}
+    except Exception as e:
+        result = {"input_path": input_path, "status": "error", "error": repr(e), "traceback": traceback.format_exc()}
+    result["elapsed_seconds"] = time.perf_counter() - start
+    return result
@@ -0,0 +1,183 @@
+import csv
+import os
+from typing import Any, Dict, List
+
+from app.portfolio import Portfolio
+
+# -- Tablas exportadas y tipo de cada columna ("category" se guarda con codificacion de diccionario en Parquet)
+TABLE_SCHEMAS: Dict[str, Dict[str, str]] = {
+    "sales": {
+        "sale_id": "int64",
+        "isin": "category",
+        "name": "category",
+        "sell_date": "date",
+        "description": "category",
+        "qty": "float64",
+        "amount": "float64",
+        "comissions": "float64",
+        "taxes": "float64",
+        "bruto": "float64",
+        "sell_price": "float64",
+        "gross_profit": "float64",
+        "net_profit": "float64",
+    },
+    "matched_buys": {
+        "sale_id": "int64",
+        "isin": "category",
+        "name": "category",
+        "sell_date": "date",
+        "buy_date": "date",
+        "buy_description": "category",
+        "matched_qty": "float64",
+        "buy_price": "float64",
+    },
+    "open_lots": {
+        "isin": "category",
+        "name": "category",
+        "buy_date": "date",
+        "description": "category",
+        "qty": "float64",
+        "buy_price": "float64",
+        "amount": "float64",
+    },
+}
+
+
+def build_columnar_tables(portfolio: Portfolio) -> Dict[str, Dict[str, List[Any]]]:
+    """
+    Aplana las ventas, los tramos de compra casados y los lotes abiertos del portfolio en tablas por columnas
+    (diccionario nombre_columna -> lista de valores)
+    :param portfolio:
+    :return:
+    """
+    tables: Dict[str, Dict[str, List[Any]]] = {
+        table: {column: [] for column in schema} for table, schema in TABLE_SCHEMAS.items()
+    }
+    sales, legs, open_lots = tables["sales"], tables["matched_buys"], tables["open_lots"]
+    sale_id: int = 0
+
+    for active in portfolio:
+        for detail in active.sales_details:
+            sell_op = detail["sell_operation"]
+            sales["sale_id"].append(sale_id)
+            sales["isin"].append(active.isin)
+            sales["name"].append(active.name)
+            sales["sell_date"].append(sell_op.str_date)
+            sales["description"].append(sell_op.description)
+            sales["qty"].append(sell_op.qty)
+            sales["amount"].append(sell_op.amount)
+            sales["comissions"].append(detail["comissions"])
+            sales["taxes"].append(detail["taxes"])
+            sales["bruto"].append(sell_op.bruto)
+            sales["sell_price"].append(sell_op.sell_price)
+            sales["gross_profit"].append(detail["gross_profit"])
+            sales["net_profit"].append(detail["net_profit"])
+
+            for match in detail["matched_buys"]:
+                legs["sale_id"].append(sale_id)
+                legs["isin"].append(active.isin)
+                legs["name"].append(active.name)
+                legs["sell_date"].append(sell_op.str_date)
+                legs["buy_date"].append(match["buy_operation"].str_date)
+                legs["buy_description"].append(match["buy_operation"].description)
+                legs["matched_qty"].append(match["matched_qty"])
+                legs["buy_price"].append(match["buy_price"])
+
+            sale_id += 1
+
+        for op in active.opened_operations_list:
+            open_lots["isin"].append(active.isin)
+            open_lots["name"].append(active.name)
+            open_lots["buy_date"].append(op.str_date)
+            open_lots["description"].append(op.description)
+            open_lots["qty"].append(op.qty)
+            open_lots["buy_price"].append(op.buy_price)
+            open_lots["amount"].append(op.amount)
+
+    return tables
+
+
+def _parquet_available() -> bool:
+    """
+    Indica si estan instalados pandas y pyarrow (necesarios para escribir Parquet)
+    """
+    try:
+        import pandas  # noqa: F401
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _to_dataframe(columns: Dict[str, List[Any]], schema: Dict[str, str]):
+    """
+    Convierte una tabla por columnas a DataFrame aplicando los tipos del esquema
+    """
+    import pandas as pd
+
+    df = pd.DataFrame(columns)
+    for column, dtype in schema.items():
+        if dtype == "date":
+            df[column] = pd.to_datetime(df[column], format="%Y-%m-%d")
+        else:
+            df[column] = df[column].astype(dtype)
+    return df
+
+
+def export_columnar_tables(portfolio: Portfolio, output_dir: str, file_format: str = "auto") -> Dict[str, str]:
+    """
+    Exporta las tablas columnares del portfolio a Parquet (si hay pandas/pyarrow) o a CSV
+    :param portfolio:
+    :param output_dir: Directorio donde se escribe un fichero por tabla
+    :param file_format: "parquet", "csv" o "auto" (Parquet si esta disponible, si no CSV)
+    :return: Diccionario tabla -> ruta del fichero
+    """
+    if file_format == "auto":
+        file_format = "parquet" if _parquet_available() else "csv"
+
+    os.makedirs(output_dir, exist_ok=True)
+    tables: Dict[str, Dict[str, List[Any]]] = build_columnar_tables(portfolio)
+    paths: Dict[str, str] = {}
+
+    for table, columns in tables.items():
+        file_path: str = os.path.join(output_dir, f"{table}.{file_format}")
+
+        if file_format == "parquet":
+            _to_dataframe(columns, TABLE_SCHEMAS[table]).to_parquet(file_path, index=False)
+        else:
+            # -- El CSV se escribe con el modulo estandar para no depender de pandas
+            with open(file_path, 'w', encoding='utf-8', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(columns.keys())
+                writer.writerows(zip(*columns.values()))
+
+        paths[table] = file_path
+
+    print(f"Tablas columnares exportadas correctamente a: {output_dir} ({file_format})")
+    return paths
+
+
+def load_columnar_tables(input_dir: str) -> Dict[str, Any]:
+    """
+    Lee las tablas columnares exportadas (Parquet o CSV) como DataFrames tipados, para usarlas como cache en lugar
+    de volver a parsear los JSON
+    :param input_dir:
+    :return: Diccionario tabla -> DataFrame
+    """
+    import pandas as pd
+
+    dataframes: Dict[str, Any] = {}
+    for table, schema in TABLE_SCHEMAS.items():
+        parquet_path: str = os.path.join(input_dir, f"{table}.parquet")
+        csv_path: str = os.path.join(input_dir, f"{table}.csv")
+
+        if os.path.exists(parquet_path):
+            dataframes[table] = pd.read_parquet(parquet_path)
+        elif os.path.exists(csv_path):
+            dtypes: Dict[str, str] = {column: dtype for column, dtype in schema.items() if dtype != "date"}
+            dates: List[str] = [column for column, dtype in schema.items() if dtype == "date"]
+            dataframes[table] = pd.read_csv(csv_path, dtype=dtypes, parse_dates=dates)
+        else:
+            raise FileNotFoundError(f"No se encuentra la tabla {table} en {input_dir}")
+
+    return dataframes
@@ -1,11 +1,40 @@
 from abc import ABC, abstractmethod
 import datetime
-from typing import List, Dict, Any
-from info_tools import InfoTools
+import hashlib
+import sys
+from typing import TYPE_CHECKING, List, Dict, Any
+from app.lot_queue import LotQueue
+from app.money import money_to_units, prorate, qty_to_units, units_to_money, units_to_qty
+from app.pnl_index import PnLIndex
+from app.report import ReportRenderer
+from app.dates import TAX_WITHHOLDING_START_DATE, TAX_WITHHOLDING_START_ORDINAL, iso_to_ordinal, ordinal_to_datetime
+
+# -- Version de las reglas de calculo (comisiones en calculate_comissions, retencion en update_with_fifo_data).
+#    Hay que incrementarla al cambiar esas reglas para invalidar los resultados guardados en cache
+RULES_VERSION: int = 2
+
+if TYPE_CHECKING:
+    from info_tools import InfoTools
+
+
+class _LazyInfoTools:
+    """
+    Descriptor de la instancia de InfoTools compartida por todos los activos. Solo el reporte por consola la usa,
+    asi que se importa y se crea la primera vez que se accede y despues sustituye al descriptor en la clase
+    """
+
+    def __set_name__(self, owner: type, name: str):
+        self.name: str = name
+
+    def __get__(self, instance: Any, owner: type) -> "InfoTools":
+        from info_tools import InfoTools
+        info_tools: InfoTools = InfoTools()
+        setattr(owner, self.name, info_tools)
+        return info_tools
 
 
 class Active:
-    IT: InfoTools = InfoTools()
+    IT: "InfoTools" = _LazyInfoTools()
     def __init__(self, isin: str, name: str):
 
         # -- 1: Almaceno parametros en propiedades
@@ -14,6 +43,7 @@ class Active:
 
         # -- 2: Defino propiedades que voy a ir utilizando dinamicamente
         self.current_qty: float = 0.0
+        self.current_qty_units: int = 0
         self.total_net_proffit: float = 0.0
         self.total_gross_proffit: float = 0.0
         self.total_comissions: float = 0.0
@@ -31,6 +61,19 @@ class Active:
         # -- 6: Lista para almacenar el detalle de cada venta (lotes cerrados)
         self.sales_details: List[Dict[str, Any]] = []
 
+        # -- 7: Estado FIFO reanudable: cola de lotes abiertos y numero de operaciones ya procesadas
+        self.fifo_queue: LotQueue = LotQueue()
+        self.fifo_processed_count: int = 0
+
+        # -- 8: Indice de resultado realizado por año/mes/dia, alimentado durante el calculo FIFO
+        self.pnl_index: PnLIndex = PnLIndex()
+
+        # -- 9: Acumulados del calculo FIFO en unidades monetarias enteras (ver app.money); los total_* en euros se
+        #       derivan de ellos al terminar el calculo
+        self.gross_profit_units: int = 0
+        self.comission_units: int = 0
+        self.tax_units: int = 0
+
     def add_operation(self, isin: str, str_date: str, description: str, qty: float, amount: float):
         """
         Metodo que valida que tipo de operacion se ha realizado y la agrega
@@ -45,177 +88,270 @@ class Active:
         # ---- 1.1: Valido si es venta
         if description.startswith("Sell"):
             self.operations_list.append(SellOperation(isin, str_date, description, qty, amount))
-            self.current_qty -= qty
+            self.current_qty_units -= qty_to_units(qty)
 
         # ---- 1.2: Valido si es compra
         else:
             self.operations_list.append(BuyOperation(isin, str_date, description, qty, amount))
-            self.current_qty += qty
+            self.current_qty_units += qty_to_units(qty)
+
+        self.current_qty = units_to_qty(self.current_qty_units)
 
     def calculate_fifo(self):
         """
-        Metodo que itera sobre la lista de operaciones y realiza el calculo FIFO
+        Metodo que itera sobre la lista de operaciones y realiza el calculo FIFO completo
+        """
+        self.reset_fifo_state()
+        self.calculate_fifo_incremental()
+
+    def ensure_fifo(self) -> "Active":
+        """
+        Metodo que calcula el FIFO solo si hay operaciones sin procesar. Como add_operation solo agrega por el final,
+        basta con continuar desde el estado actual (el resultado queda memorizado hasta la siguiente operacion)
+        :return: El propio activo, para encadenar consultas
+        """
+        if self.fifo_processed_count < len(self.operations_list):
+            self.calculate_fifo_incremental()
+        return self
+
+    def calculate_fifo_incremental(self):
+        """
+        Metodo que aplica el calculo FIFO solo a las operaciones agregadas desde el ultimo calculo (o desde el estado
+        restaurado de un checkpoint) y recalcula los totales y los lotes abiertos
+        """
+        for operation in self.operations_list[self.fifo_processed_count:]:
+            self._apply_fifo_operation(operation)
+        self.fifo_processed_count = len(self.operations_list)
+
+        self._finalize_fifo()
+
+    def reset_fifo_state(self):
+        """
+        Metodo que reinicia los contadores, las listas de resultados y la cola FIFO
         """
         # Reiniciamos contadores
         self.total_net_proffit = 0.0
         self.total_gross_proffit = 0.0
         self.total_comissions = 0.0
         self.total_taxes = 0.0
-        
+
         self.opened_operations_list = []
         self.closed_operations_list = []
         self.sales_details = []
 
-        # Cola FIFO para las compras disponibles: lista de diccionarios {'op': BuyOperation, 'remaining_qty': float}
-        fifo_queue = []
-
-        for operation in self.operations_list:
-            if isinstance(operation, BuyOperation):
-                # Agregamos a la cola
-                fifo_queue.append({'op': operation, 'remaining_qty': operation.qty})
-                
-                # Sumamos comision
-                self.total_comissions += operation.comissions
-                
-            elif isinstance(operation, SellOperation):
-                qty_to_sell = operation.qty
-                
-                # Paso 1: Identificar lotes y coste total de compra para esta venta
-                matched_entries = [] 
-                total_buy_cost = 0.0
-                
-                # Usamos una variable temporal para no modificar la cola hasta estar seguros, 
-                # aunque en este caso vamos consumiendo directamente porque es FIFO estricto.
-                
-                while qty_to_sell > 0 and fifo_queue:
-                    buy_entry = fifo_queue[0]
-                    available_qty = buy_entry['remaining_qty']
-                    
-                    # Cantidad a casar
-                    matched_qty = min(qty_to_sell, available_qty)
-                    
-                    # Guardamos referencia para luego calcular beneficios individuales
-                    matched_entries.append({
-                        'buy_op': buy_entry['op'],
-                        'matched_qty': matched_qty,
-                        'buy_price': buy_entry['op'].buy_price
-                    })
-                    
-                    # Acumulamos el coste de compra
-                    total_buy_cost += matched_qty * buy_entry['op'].buy_price
-                    
-                    # Actualizamos cantidades en la cola
-                    qty_to_sell -= matched_qty
-                    buy_entry['remaining_qty'] -= matched_qty
-                    
-                    # Si se agota la compra, la sacamos de la cola
-                    if buy_entry['remaining_qty'] <= 0.000001:
-                        fifo_queue.pop(0)
-                
-                # Paso 2: Actualizar la operación de venta con los impuestos y precio real calculados
-                # basándonos en el coste de compra (para saber la plusvalía)
-                operation.update_with_fifo_data(total_buy_cost)
-                
-                # Agregamos a cerradas y sumamos totales
-                self.closed_operations_list.append(operation)
-                self.total_comissions += operation.comissions
-                self.total_taxes += operation.taxes
-                
-                # Paso 3: Calcular beneficios y rellenar detalles
-                current_sale_gross_profit = 0.0
-                
-                sale_detail = {
-                    'sell_operation': operation,
-                    'matched_buys': [],
-                    'gross_profit': 0.0,
-                    'net_profit': 0.0,
-                    'comissions': operation.comissions,
-                    'taxes': operation.taxes
-                }
-                
-                for match in matched_entries:
-                    buy_op = match['buy_op']
-                    matched_qty = match['matched_qty']
-                    buy_price = match['buy_price']
-                    
-                    # Calculamos beneficio bruto de este tramo
-                    profit = (operation.sell_price - buy_price) * matched_qty
-                    current_sale_gross_profit += profit
-                    self.total_gross_proffit += profit
-                    
-                    sale_detail['matched_buys'].append({
-                        'buy_operation': buy_op,
+        # Cola FIFO para las compras disponibles: lotes (BuyOperation, cantidad restante) con retirada O(1)
+        self.fifo_queue = LotQueue()
+        self.fifo_processed_count = 0
+        self.pnl_index = PnLIndex()
+        self.gross_profit_units = 0
+        self.comission_units = 0
+        self.tax_units = 0
+
+    def _apply_fifo_operation(self, operation: "Operation"):
+        """
+        Metodo que aplica una unica operacion sobre la cola FIFO y los totales acumulados
+        :param operation:
+        :return:
+        """
+        fifo_queue: LotQueue = self.fifo_queue
+
+        if isinstance(operation, BuyOperation):
+            # Agregamos a la cola (cantidad en micro-participaciones y coste sin comisiones en unidades monetarias)
+            fifo_queue.append(operation, qty_to_units(operation.qty),
+                              money_to_units(operation.amount) - money_to_units(operation.comissions))
+
+            # Sumamos comision
+            self.comission_units += money_to_units(operation.comissions)
+
+        elif isinstance(operation, SellOperation):
+            sell_qty_units = qty_to_units(operation.qty)
+            qty_to_sell = sell_qty_units
+
+            # Paso 1: Identificar lotes y coste total de compra para esta venta
+            matched_entries = []
+            total_buy_cost_units = 0
+
+            # Vamos consumiendo directamente de la cola porque es FIFO estricto.
+            while qty_to_sell > 0 and fifo_queue:
+                buy_op = fifo_queue.front_op()
+
+                # Casamos contra el lote mas antiguo (si se agota, la cola lo retira) y obtenemos el coste del tramo
+                matched_qty, matched_cost = fifo_queue.consume_front(qty_to_sell)
+
+                # Guardamos referencia para luego rellenar los detalles de la venta
+                matched_entries.append({
+                    'buy_operation': buy_op,
+                    'matched_qty': units_to_qty(matched_qty),
+                    'buy_price': buy_op.buy_price
+                })
+
+                # Acumulamos el coste de compra y actualizamos la cantidad pendiente de vender
+                total_buy_cost_units += matched_cost
+                qty_to_sell -= matched_qty
+
+            # Paso 2: Actualizar la operación de venta con los impuestos y precio real calculados
+            # basándonos en el coste de compra (para saber la plusvalía)
+            operation.update_with_fifo_data(units_to_money(total_buy_cost_units))
+
+            # Agregamos a cerradas y sumamos totales
+            comission_units = money_to_units(operation.comissions)
+            tax_units = money_to_units(operation.taxes)
+            self.closed_operations_list.append(operation)
+            self.comission_units += comission_units
+            self.tax_units += tax_units
+
+            # Paso 3: Beneficio bruto = parte del bruto de venta correspondiente a la cantidad casada - coste de compra
+            #         (si no hay compras suficientes, la parte sin casar no cuenta)
+            bruto_units = money_to_units(operation.bruto)
+            if qty_to_sell > 0:
+                bruto_units = prorate(bruto_units, sell_qty_units - qty_to_sell, sell_qty_units)
+            gross_profit_units = bruto_units - total_buy_cost_units
+            self.gross_profit_units += gross_profit_units
+
+            # Calculamos beneficio neto de esta venta
+            current_sale_gross_profit = units_to_money(gross_profit_units)
+            current_sale_net_profit = units_to_money(gross_profit_units - comission_units - tax_units)
+
+            self.sales_details.append({
+                'sell_operation': operation,
+                'matched_buys': matched_entries,
+                'gross_profit': current_sale_gross_profit,
+                'net_profit': current_sale_net_profit,
+                'comissions': operation.comissions,
+                'taxes': operation.taxes
+            })
+            self.pnl_index.add_sale(operation.str_date, operation.date_ordinal, current_sale_gross_profit,
+                                    current_sale_net_profit, operation.comissions, operation.taxes)
+
+    def _finalize_fifo(self):
+        """
+        Metodo que calcula el beneficio neto total y rellena opened_operations_list con lo que queda en la cola
+        """
+        # Pasamos los totales a euros y calculamos beneficio neto total
+        self.total_gross_proffit = units_to_money(self.gross_profit_units)
+        self.total_comissions = units_to_money(self.comission_units)
+        self.total_taxes = units_to_money(self.tax_units)
+        self.total_net_proffit = units_to_money(self.gross_profit_units - self.comission_units - self.tax_units)
+
+        # Rellenamos opened_operations_list con lo que queda en la cola
+        self.opened_operations_list = []
+        for original_op, remaining_qty in self.fifo_queue:
+            self.opened_operations_list.append(BuyOperation.open_lot(original_op, units_to_qty(remaining_qty)))
+
+    def operations_fingerprint(self, count: int) -> str:
+        """
+        Metodo que calcula una huella (sha1) de las primeras count operaciones para detectar ediciones del historico
+        :param count:
+        :return:
+        """
+        digest = hashlib.sha1()
+        for op in self.operations_list[:count]:
+            digest.update(f"{op.str_date}|{op.description}|{op.qty!r}|{op.amount!r}\n".encode("utf-8"))
+        return digest.hexdigest()
+
+    def fifo_state_to_dict(self, include_fingerprint: bool = True) -> Dict[str, Any]:
+        """
+        Convierte el estado FIFO (lotes abiertos, totales y ventas casadas) a un diccionario serializable.
+        Las operaciones se referencian por su posicion en operations_list.
+        :param include_fingerprint: Si es False no se calcula la huella (solo hace falta para los checkpoints)
+        """
+        positions: Dict[int, int] = {id(op): idx for idx, op in enumerate(self.operations_list)}
+        processed_count: int = self.fifo_processed_count
+
+        return {
+            "processed_count": processed_count,
+            "last_date": self.operations_list[processed_count - 1].str_date if processed_count else None,
+            "fingerprint": self.operations_fingerprint(processed_count) if include_fingerprint else None,
+            "total_gross_proffit": self.total_gross_proffit,
+            "total_comissions": self.total_comissions,
+            "total_taxes": self.total_taxes,
+            "open_lots": [[positions[id(op)], units_to_qty(remaining_qty)] for op, remaining_qty in self.fifo_queue],
+            "sales": [
+                [
+                    positions[id(detail["sell_operation"])],
+                    detail["sell_operation"].taxes,
+                    detail["sell_operation"].bruto,
+                    detail["sell_operation"].sell_price,
+                    detail["gross_profit"],
+                    detail["net_profit"],
+                    [
+                        [positions[id(match["buy_operation"])], match["matched_qty"], match["buy_price"]]
+                        for match in detail["matched_buys"]
+                    ]
+                ]
+                for detail in self.sales_details
+            ]
+        }
+
+    def restore_fifo_state(self, state: Dict[str, Any]) -> bool:
+        """
+        Restaura el estado FIFO guardado con fifo_state_to_dict si las operaciones ya procesadas no han cambiado
+        :param state:
+        :return: True si se ha restaurado, False si hay que recalcular desde cero
+        """
+        processed_count: int = state["processed_count"]
+
+        # -- 1: Si el historico anterior al checkpoint ha cambiado, no se puede reanudar
+        if processed_count > len(self.operations_list):
+            return False
+        if state["fingerprint"] != self.operations_fingerprint(processed_count):
+            return False
+
+        # -- 2: Reconstruyo la cola, las ventas casadas y los totales
+        self.load_fifo_state(state)
+        return True
+
+    def load_fifo_state(self, state: Dict[str, Any]):
+        """
+        Carga un estado FIFO con el formato de fifo_state_to_dict (sin validar la huella), p.ej. el calculado por el
+        motor vectorizado. Para recalcular totales y lotes abiertos hay que llamar despues a calculate_fifo_incremental
+        :param state:
+        :return:
+        """
+        processed_count: int = state["processed_count"]
+        self.reset_fifo_state()
+        operations_list: List[Operation] = self.operations_list
+
+        for op_idx, remaining_qty in state["open_lots"]:
+            op: BuyOperation = operations_list[op_idx]
+            self.fifo_queue.append(op, qty_to_units(op.qty), money_to_units(op.amount) - money_to_units(op.comissions),
+                                   qty_to_units(remaining_qty))
+
+        for sell_idx, taxes, bruto, sell_price, gross_profit, net_profit, matched_buys in state["sales"]:
+            sell_op: SellOperation = operations_list[sell_idx]
+            sell_op.taxes = taxes
+            sell_op.bruto = bruto
+            sell_op.sell_price = sell_price
+
+            self.closed_operations_list.append(sell_op)
+            self.sales_details.append({
+                'sell_operation': sell_op,
+                'matched_buys': [
+                    {
+                        'buy_operation': operations_list[buy_idx],
                         'matched_qty': matched_qty,
                         'buy_price': buy_price
-                    })
-                
-                # Calculamos beneficio neto de esta venta
-                current_sale_net_profit = current_sale_gross_profit - operation.comissions - operation.taxes
-                
-                sale_detail['gross_profit'] = current_sale_gross_profit
-                sale_detail['net_profit'] = current_sale_net_profit
-                
-                self.sales_details.append(sale_detail)
-        
-        # Calculamos beneficio neto total
-        self.total_net_proffit = self.total_gross_proffit - self.total_comissions - self.total_taxes
-        
-        # Rellenamos opened_operations_list con lo que queda en la cola
-        for entry in fifo_queue:
-            original_op = entry['op']
-            remaining_qty = entry['remaining_qty']
-            
-            # Calculamos el amount equivalente para que el precio de compra se mantenga
-            new_amount = original_op.buy_price * remaining_qty
-            
-            new_op = BuyOperation(
-                isin=original_op.isin,
-                str_date=original_op.str_date,
-                description=original_op.description,
-                qty=remaining_qty,
-                amount=new_amount
-            )
-            
-            new_op.comissions = 0.0
-            new_op.buy_price = original_op.buy_price
-            
-            self.opened_operations_list.append(new_op)
+                    }
+                    for buy_idx, matched_qty, buy_price in matched_buys
+                ],
+                'gross_profit': gross_profit,
+                'net_profit': net_profit,
+                'comissions': sell_op.comissions,
+                'taxes': taxes
+            })
+            self.pnl_index.add_sale(sell_op.str_date, sell_op.date_ordinal, gross_profit, net_profit,
+                                    sell_op.comissions, taxes)
+
+        self.gross_profit_units = money_to_units(state["total_gross_proffit"])
+        self.comission_units = money_to_units(state["total_comissions"])
+        self.tax_units = money_to_units(state["total_taxes"])
+        self.fifo_processed_count = processed_count
 
     def print_fifo_report(self):
         """
         Metodo para imprimir en consola el reporte de las operaciones FIFO
         """
-        self.IT.header_print(f"Reporte FIFO para {self.name} ({self.isin})")
-
-        self.IT.intro_print("TOTALES")
-        self.IT.info_print(f"Total Gross Profit: {self.total_gross_proffit:.2f}")
-        self.IT.info_print(f"Total Net Profit: {self.total_net_proffit:.2f}")
-        self.IT.info_print(f"Total Commissions: {self.total_comissions:.2f}")
-        self.IT.info_print(f"Total Taxes: {self.total_taxes:.2f}")
-
-        self.IT.intro_print("OPERACIONES CERRADAS (Lotes Casados):")
-
-        for detail in self.sales_details:
-            sell_op = detail['sell_operation']
-            self.IT.sub_intro_print(f"VENTA: Fecha: {sell_op.str_date},"
-                                    f" Qty: {sell_op.qty},"
-                                    f" Precio Venta: {sell_op.sell_price:.4f},"
-                                    f" Bruto: {detail['gross_profit']:.2f},"
-                                    f" Comisiones: {detail['comissions']:.2f},"
-                                    f" Impuestos: {detail['taxes']:.2f},"
-                                    f" [NETO]: {detail['net_profit']:.2f} €"
-                                    )
-
-            for match in detail['matched_buys']:
-                buy_op = match['buy_operation']
-                matched_qty = match['matched_qty']
-                buy_price = match['buy_price']
-                self.IT.info_print(f"    - COMPRA: Fecha: {buy_op.str_date}, Qty Casada: {matched_qty:.4f}, Precio Compra: {buy_price:.4f}")
-
-            
-        self.IT.intro_print("Operaciones Abiertas (Cartera Actual):")
-        for op in self.opened_operations_list:
-            self.IT.info_print(f"  - Fecha: {op.str_date}, Qty: {op.qty:.4f}, Precio Compra: {op.buy_price:.4f}")
+        ReportRenderer("console").render([self])
 
     def to_dict(self) -> Dict[str, Any]:
         """
@@ -229,6 +365,7 @@ class Active:
             "total_gross_proffit": self.total_gross_proffit,
             "total_comissions": self.total_comissions,
             "total_taxes": self.total_taxes,
+            "pnl_by_year": self.pnl_index.years_to_dict(),
             "operations_list": [op.to_dict() for op in self.operations_list],
             "closed_operations_list": [op.to_dict() for op in self.closed_operations_list],
             "opened_operations_list": [op.to_dict() for op in self.opened_operations_list],
@@ -254,16 +391,26 @@ class Active:
 
 
 class Operation(ABC):
+    # -- Sin __dict__ por instancia: un extracto grande genera cientos de miles de operaciones
+    __slots__ = ("isin", "str_date", "date_ordinal", "description", "qty", "amount")
+
     def __init__(self, isin: str, str_date: str, description: str, qty: float, amount: float):
 
-        # -- 1: Almaceno parametros en propiedades
-        self.isin: str = isin
-        self.str_date: str = str_date
-        self.datetime: datetime.datetime = datetime.datetime.strptime(self.str_date, "%Y-%m-%d")
-        self.description: str = description
+        # -- 1: Almaceno parametros en propiedades (los textos repetidos se internan para compartir memoria)
+        self.isin: str = sys.intern(isin)
+        self.str_date: str = sys.intern(str_date)
+        self.date_ordinal: int = iso_to_ordinal(str_date)
+        self.description: str = sys.intern(description)
         self.qty: float = qty
         self.amount: float = amount
 
+    @property
+    def datetime(self) -> datetime.datetime:
+        """
+        Fecha de la operacion como datetime (se construye bajo demanda a partir del ordinal)
+        """
+        return ordinal_to_datetime(self.date_ordinal)
+
     def to_dict(self) -> Dict[str, Any]:
         """
         Convierte la operación base a un diccionario.
@@ -279,6 +426,8 @@ class Operation(ABC):
 
 
 class BuyOperation(Operation):
+    __slots__ = ("comissions", "buy_price")
+
     def __init__(self, isin: str, str_date: str, description: str, qty: float, amount: float):
         super().__init__(isin, str_date, description, qty, amount)
         
@@ -287,7 +436,28 @@ class BuyOperation(Operation):
 
         # -- 2: Defino y calculo el precio de compra
         self.buy_price: float = self.calculate_buy_price()
-    
+
+    @classmethod
+    def open_lot(cls, original_op: "BuyOperation", remaining_qty: float) -> "BuyOperation":
+        """
+        Crea el lote abierto que queda de una compra tras el casado FIFO, sin volver a parsear fecha ni textos
+        :param original_op: Compra original
+        :param remaining_qty: Cantidad que queda sin vender
+        :return:
+        """
+        new_op: BuyOperation = cls.__new__(cls)
+        new_op.isin = original_op.isin
+        new_op.str_date = original_op.str_date
+        new_op.date_ordinal = original_op.date_ordinal
+        new_op.description = original_op.description
+        new_op.qty = remaining_qty
+
+        # -- Calculamos el amount equivalente para que el precio de compra se mantenga
+        new_op.amount = original_op.buy_price * remaining_qty
+        new_op.comissions = 0.0
+        new_op.buy_price = original_op.buy_price
+        return new_op
+
     def calculate_buy_price(self) -> float:
         """
         Metodo para calcular el precio de compra exacto en funcion de las comisiones, la cantidad y el importe
@@ -328,6 +498,14 @@ class BuyOperation(Operation):
 
 
 class SellOperation(Operation):
+    __slots__ = ("comissions", "taxes", "bruto", "sell_price")
+
+    # -- Regla de retencion: ventas de ISIN irlandeses desde la fecha indicada retienen el 19% de la plusvalia
+    TAX_RATE: float = 0.19
+    TAX_ISIN_PREFIX: str = "IE"
+    TAX_START_DATE: str = TAX_WITHHOLDING_START_DATE
+    TAX_START_ORDINAL: int = TAX_WITHHOLDING_START_ORDINAL
+
     def __init__(self, isin:str, str_date: str, description: str, qty: float, amount: float):
         super().__init__(isin, str_date, description, qty, amount)
 
@@ -343,8 +521,7 @@ class SellOperation(Operation):
         """
         Determina si se debe aplicar retención basada en el ISIN y la fecha.
         """
-        datetime_limit = datetime.datetime.strptime("2025-07-01", "%Y-%m-%d")
-        return self.isin.startswith("IE") and self.datetime >= datetime_limit
+        return self.isin.startswith(self.TAX_ISIN_PREFIX) and self.date_ordinal >= self.TAX_START_ORDINAL
 
     def update_with_fifo_data(self, total_buy_cost: float):
         """
@@ -357,7 +534,7 @@ class SellOperation(Operation):
             # Despejando VentaBruta:
             # VentaBruta = (Incoming + Comision - 0.19 * CosteCompra) / 0.81
             
-            tax_rate = 0.19
+            tax_rate = self.TAX_RATE
             incoming = self.amount
             
             # Venta bruta hipotética asumiendo que hubo retención
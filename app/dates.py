@@ -0,0 +1,37 @@
+import datetime
+import re
+from functools import lru_cache
+
+# -- Los extractos repiten unos pocos miles de fechas distintas en cientos de miles de filas
+DATE_CACHE_SIZE: int = 8192
+
+# -- Formato estricto YYYY-MM-DD (el de strptime("%Y-%m-%d")). date.fromisoformat acepta ademas "20250801" o
+#    "2025-W01-1", y el resto del codigo trocea la cadena ([:4] año, [:7] mes) y compara fechas como texto
+ISO_DATE_PATTERN: re.Pattern = re.compile(r"\d{4}-\d{2}-\d{2}", re.ASCII)
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def iso_to_ordinal(str_date: str) -> int:
+    """
+    Convierte una fecha ISO (YYYY-MM-DD) a su ordinal (dias desde 0001-01-01), memorizando las fechas recientes
+    :param str_date:
+    :return:
+    """
+    if ISO_DATE_PATTERN.fullmatch(str_date) is None:
+        raise ValueError(f"time data {str_date!r} does not match format '%Y-%m-%d'")
+    return datetime.date.fromisoformat(str_date).toordinal()
+
+
+def ordinal_to_datetime(date_ordinal: int) -> datetime.datetime:
+    """
+    Convierte un ordinal a datetime (a las 00:00)
+    :param date_ordinal:
+    :return:
+    """
+    return datetime.datetime.fromordinal(date_ordinal)
+
+
+# -- Fechas de corte de regimen fiscal, precalculadas como ordinales
+# ---- Desde esta fecha las ventas de ISIN irlandeses llegan con retencion
+TAX_WITHHOLDING_START_DATE: str = "2025-07-01"
+TAX_WITHHOLDING_START_ORDINAL: int = iso_to_ordinal(TAX_WITHHOLDING_START_DATE)
@@ -0,0 +1,105 @@
+import heapq
+import json
+from typing import Any, Dict, Iterable, Iterator, Literal, TextIO
+
+from app.data_classes import Active
+from app.portfolio import Portfolio
+
+# -- Formatos de salida: "indent" (igual que json.dump con indent=4), "compact" (sin espacios) o "ndjson" (un
+#    objeto por linea)
+OutputFormat = Literal["indent", "compact", "ndjson"]
+OUTPUT_FORMATS: tuple = ("indent", "compact", "ndjson")
+
+
+def write_json_items(f: TextIO, items: Iterable[Dict[str, Any]], output_format: OutputFormat = "indent") -> int:
+    """
+    Escribe los elementos uno a uno, sin construir la lista completa en memoria
+    :param f: Fichero de texto abierto para escritura
+    :param items: Elementos serializables
+    :param output_format:
+    :return: Numero de elementos escritos
+    """
+    n_items: int = 0
+
+    # -- 1: NDJSON: un objeto por linea
+    if output_format == "ndjson":
+        for item in items:
+            f.write(json.dumps(item, ensure_ascii=False, separators=(",", ":")))
+            f.write("\n")
+            n_items += 1
+        return n_items
+
+    # -- 2: Array JSON compacto o indentado (mismo resultado que json.dump(lista, indent=4))
+    indent: bool = output_format == "indent"
+    f.write("[")
+    for item in items:
+        if n_items:
+            f.write(",\n" if indent else ",")
+        elif indent:
+            f.write("\n")
+
+        if indent:
+            f.write("    ")
+            f.write(json.dumps(item, indent=4, ensure_ascii=False).replace("\n", "\n    "))
+        else:
+            f.write(json.dumps(item, ensure_ascii=False, separators=(",", ":")))
+        n_items += 1
+    f.write("\n]" if indent and n_items else "]")
+    return n_items
+
+
+def file_extension(output_format: OutputFormat) -> str:
+    """
+    Devuelve la extension del fichero segun el formato de salida
+    """
+    return "ndjson" if output_format == "ndjson" else "json"
+
+
+def build_sale_entry(active: Active, detail: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Construye el diccionario plano de una venta para el historico de ventas
+    :param active:
+    :param detail: Elemento de active.sales_details
+    :return:
+    """
+    return {
+        "active_name": active.name,
+        "active_isin": active.isin,
+        # Usamos la fecha de la venta para ordenar
+        "sell_date": detail['sell_operation'].str_date,
+        "sell_operation": detail['sell_operation'].to_dict(),
+        "gross_profit": detail['gross_profit'],
+        "net_profit": detail['net_profit'],
+        "comissions": detail['comissions'],
+        "taxes": detail['taxes'],
+        "matched_buys": [
+            {
+                "buy_operation": match["buy_operation"].to_dict(),
+                "matched_qty": match["matched_qty"],
+                "buy_price": match["buy_price"]
+            }
+            for match in detail["matched_buys"]
+        ]
+    }
+
+
+def _iter_active_sales_desc(active: Active) -> Iterator[Dict[str, Any]]:
+    """
+    Generador de las ventas de un activo por fecha descendente. Las ventas ya vienen en orden cronologico, asi que
+    la ordenacion (estable) es lineal; solo se ordenan referencias, los diccionarios se construyen bajo demanda
+    """
+    details = sorted(active.sales_details, key=lambda detail: detail['sell_operation'].str_date, reverse=True)
+    for detail in details:
+        yield build_sale_entry(active, detail)
+
+
+def iter_sales_history(portfolio: Portfolio) -> Iterator[Dict[str, Any]]:
+    """
+    Generador del historico de ventas de todo el portfolio por fecha descendente (mas reciente primero).
+    Mezcla (k-way merge) los flujos de ventas de cada activo en lugar de ordenar una lista global; a igualdad de
+    fecha se respeta el orden de los activos y de las ventas, igual que la ordenacion estable anterior
+    :param portfolio:
+    :return:
+    """
+    streams = [_iter_active_sales_desc(active) for active in portfolio if active.sales_details]
+    return heapq.merge(*streams, key=lambda entry: entry['sell_date'], reverse=True)
@@ -0,0 +1,101 @@
+import hashlib
+import json
+import os
+from typing import Any, Dict, Optional
+
+from app.portfolio import Portfolio
+from app.result_cache import ResultCache
+
+
+class FifoCheckpoint:
+    """
+    Checkpoint en disco del estado FIFO de cada activo de un extracto.
+
+    Permite que una ejecucion posterior sobre el mismo extracto (que solo crece por el final) aplique el calculo FIFO
+    unicamente a las operaciones nuevas. Si alguna operacion anterior al checkpoint ha cambiado, el activo se
+    recalcula desde cero; si han cambiado las reglas de comisiones/impuestos, se descarta el checkpoint entero.
+    """
+
+    VERSION: int = 1
+
+    def __init__(self, file_path: str):
+
+        # -- 1: Ruta del fichero de checkpoint
+        self.file_path: str = file_path
+
+        # -- 2: Estados FIFO por ISIN (vacio si no hay checkpoint o no es valido)
+        self.states: Dict[str, Dict[str, Any]] = {}
+
+    @staticmethod
+    def path_for(input_path: str, checkpoint_dir: str = "data/checkpoints") -> str:
+        """
+        Metodo que devuelve la ruta del checkpoint de un extracto. Va indexada por la ruta absoluta del extracto (no
+        solo por su nombre) para que dos extractos con el mismo nombre no se pisen el checkpoint en cada ejecucion
+        :param input_path:
+        :param checkpoint_dir:
+        :return:
+        """
+        path_digest: str = hashlib.sha256(os.path.abspath(input_path).encode("utf-8")).hexdigest()[:16]
+        return os.path.join(checkpoint_dir, f"{os.path.basename(input_path)}.{path_digest}.fifo.json")
+
+    def load(self) -> "FifoCheckpoint":
+        """
+        Metodo que carga el checkpoint si existe, es de la version actual y se calculo con las mismas reglas de
+        comisiones/impuestos (los importes guardados dependen de ellas)
+        :return:
+        """
+        if not os.path.exists(self.file_path):
+            return self
+
+        with open(self.file_path, 'r', encoding='utf-8') as f:
+            data: dict = json.load(f)
+
+        if data.get("version") == self.VERSION and data.get("rules") == ResultCache.rules_fingerprint():
+            self.states = data.get("assets", {})
+
+        return self
+
+    def get(self, isin: str) -> Optional[Dict[str, Any]]:
+        """
+        Metodo que devuelve el estado guardado de un ISIN o None si no existe
+        :param isin:
+        :return:
+        """
+        return self.states.get(isin)
+
+    def apply(self, portfolio: Portfolio) -> Dict[str, int]:
+        """
+        Metodo que calcula el FIFO de cada activo reanudando desde el checkpoint cuando es posible
+        :param portfolio:
+        :return: Contadores de activos reanudados y recalculados desde cero
+        """
+        stats: Dict[str, int] = {"resumed": 0, "recomputed": 0}
+
+        for active in portfolio:
+            state: Optional[Dict[str, Any]] = self.get(active.isin)
+            if state is not None and active.restore_fifo_state(state):
+                active.calculate_fifo_incremental()
+                stats["resumed"] += 1
+            else:
+                active.calculate_fifo()
+                stats["recomputed"] += 1
+
+        return stats
+
+    def save(self, portfolio: Portfolio):
+        """
+        Metodo que guarda el estado FIFO actual de todos los activos del portfolio
+        :param portfolio:
+        :return:
+        """
+        self.states = {active.isin: active.fifo_state_to_dict() for active in portfolio}
+
+        directory: str = os.path.dirname(self.file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # -- Escribo en un temporal y lo renombro para no dejar un checkpoint a medias si se corta la ejecucion
+        tmp_path: str = f"{self.file_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": self.VERSION, "rules": ResultCache.rules_fingerprint(), "assets": self.states}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.file_path)
@@ -0,0 +1,111 @@
+from typing import Any, Iterator, List, Optional, Tuple
+
+from app.money import prorate
+
+
+class LotQueue:
+    """
+    Cola FIFO de lotes de compra abiertos.
+
+    Guarda los lotes en listas paralelas (operacion, cantidad y coste del lote y cantidad restante) y un indice de
+    cabeza, de forma que retirar el lote mas antiguo es O(1) amortizado en lugar del O(n) de list.pop(0).
+
+    Cantidades y costes son enteros escalados (ver app.money): un lote se retira cuando su cantidad restante es
+    exactamente 0, y el coste de cada tramo casado se reparte por cantidad acumulada, asi que los tramos de un lote
+    suman exactamente su coste.
+    """
+
+    __slots__ = ("ops", "lot_qtys", "lot_costs", "remaining_qtys", "head")
+
+    # -- Numero minimo de lotes consumidos antes de plantear compactar las listas
+    COMPACT_THRESHOLD: int = 1024
+
+    def __init__(self):
+
+        # -- 1: Listas paralelas con la operacion de compra, la cantidad y el coste del lote (micro-participaciones y
+        #       unidades monetarias) y la cantidad que queda por casar
+        self.ops: List[Any] = []
+        self.lot_qtys: List[int] = []
+        self.lot_costs: List[int] = []
+        self.remaining_qtys: List[int] = []
+
+        # -- 2: Posicion del primer lote aun abierto
+        self.head: int = 0
+
+    def append(self, op: Any, qty: int, cost: int, remaining_qty: Optional[int] = None):
+        """
+        Metodo que agrega un lote al final de la cola
+        :param op:
+        :param qty: Cantidad del lote (micro-participaciones)
+        :param cost: Coste del lote sin comisiones (unidades monetarias)
+        :param remaining_qty: Cantidad aun sin casar, si el lote ya se ha vendido en parte (p.ej. al restaurar un estado)
+        :return:
+        """
+        self.ops.append(op)
+        self.lot_qtys.append(qty)
+        self.lot_costs.append(cost)
+        self.remaining_qtys.append(qty if remaining_qty is None else remaining_qty)
+
+    def front_op(self) -> Any:
+        """
+        Metodo que devuelve la operacion del lote mas antiguo
+        :return:
+        """
+        return self.ops[self.head]
+
+    def front_qty(self) -> int:
+        """
+        Metodo que devuelve la cantidad restante del lote mas antiguo
+        :return:
+        """
+        return self.remaining_qtys[self.head]
+
+    def consume_front(self, qty: int) -> Tuple[int, int]:
+        """
+        Metodo que casa hasta qty unidades contra el lote mas antiguo y lo retira si se agota
+        :param qty: Cantidad pendiente de casar (micro-participaciones)
+        :return: Cantidad realmente casada contra el lote y su coste
+        """
+        head: int = self.head
+        lot_qty: int = self.lot_qtys[head]
+        lot_cost: int = self.lot_costs[head]
+        available_qty: int = self.remaining_qtys[head]
+        matched_qty: int = qty if qty < available_qty else available_qty
+
+        # -- El coste del tramo es la diferencia del coste acumulado del lote antes y despues de casarlo
+        consumed_qty: int = lot_qty - available_qty
+        matched_cost: int = prorate(lot_cost, consumed_qty + matched_qty, lot_qty) - prorate(lot_cost, consumed_qty, lot_qty)
+
+        remaining_qty: int = available_qty - matched_qty
+        self.remaining_qtys[head] = remaining_qty
+
+        # -- Si se agota la compra, avanzamos la cabeza
+        if remaining_qty == 0:
+            self.ops[head] = None
+            self.head = head + 1
+            self._maybe_compact()
+
+        return matched_qty, matched_cost
+
+    def _maybe_compact(self):
+        """
+        Metodo que libera la parte ya consumida de las listas cuando supera la mitad de su tamaño
+        :return:
+        """
+        head: int = self.head
+        if head >= self.COMPACT_THRESHOLD and head * 2 >= len(self.ops):
+            del self.ops[:head]
+            del self.lot_qtys[:head]
+            del self.lot_costs[:head]
+            del self.remaining_qtys[:head]
+            self.head = 0
+
+    def __iter__(self) -> Iterator[Tuple[Any, int]]:
+        head: int = self.head
+        return zip(self.ops[head:], self.remaining_qtys[head:])
+
+    def __len__(self) -> int:
+        return len(self.ops) - self.head
+
+    def __bool__(self) -> bool:
+        return self.head < len(self.ops)
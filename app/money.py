@@ -0,0 +1,50 @@
+# -- Representacion en enteros escalados de cantidades e importes del motor FIFO. Los extractos traen cantidades con
+#    6 decimales e importes en centimos, asi que ambos pasan a enteros sin perdida; las sumas son exactas, un lote se
+#    agota cuando le quedan exactamente 0 micro-participaciones y la conversion a float se hace solo al exportar
+
+# -- Micro-participaciones por participacion
+QTY_SCALE: int = 1_000_000
+
+# -- Unidades monetarias internas por euro: centimos con 6 decimales mas, para poder repartir el coste de un lote por
+#    micro-participacion sin perder centimos
+MONEY_SCALE: int = 100_000_000
+
+
+def qty_to_units(qty: float) -> int:
+    """
+    Convierte una cantidad a micro-participaciones
+    """
+    return round(qty * QTY_SCALE)
+
+
+def units_to_qty(units: int) -> float:
+    """
+    Convierte micro-participaciones a cantidad
+    """
+    return units / QTY_SCALE
+
+
+def money_to_units(amount: float) -> int:
+    """
+    Convierte un importe en euros a unidades monetarias internas
+    """
+    return round(amount * MONEY_SCALE)
+
+
+def units_to_money(units: int) -> float:
+    """
+    Convierte unidades monetarias internas a euros
+    """
+    return units / MONEY_SCALE
+
+
+def prorate(total: int, part: int, whole: int) -> int:
+    """
+    Parte entera de total * part / whole. Como el reparto acumulado de una parte [a, b) de un todo se calcula como
+    prorate(total, b, whole) - prorate(total, a, whole), los tramos consecutivos suman exactamente total
+    :param total: Importe a repartir
+    :param part: Parte acumulada (0 <= part <= whole)
+    :param whole: Todo
+    :return:
+    """
+    return total * part // whole
@@ -0,0 +1,57 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+from app.data_classes import Active
+from app.portfolio import Portfolio
+
+# -- Lote de trabajo de un activo: (isin, name, [(str_date, description, qty, amount), ...])
+ActiveBatch = Tuple[str, str, List[Tuple[str, str, float, float]]]
+
+
+def compute_fifo_state(batch: ActiveBatch) -> Dict[str, Any]:
+    """
+    Funcion que se ejecuta en cada proceso: reconstruye el activo a partir de sus operaciones, calcula el FIFO y
+    devuelve el estado compacto (operaciones referenciadas por posicion) para que viaje barato de vuelta
+    :param batch:
+    :return:
+    """
+    isin, name, operations = batch
+    active: Active = Active(isin=isin, name=name)
+    for str_date, description, qty, amount in operations:
+        active.add_operation(isin=isin, str_date=str_date, description=description, qty=qty, amount=amount)
+    active.calculate_fifo()
+    return active.fifo_state_to_dict(include_fingerprint=False)
+
+
+class ParallelFifoRunner:
+    """
+    Calcula el FIFO de todos los activos de un portfolio repartiendo los activos entre varios procesos.
+
+    Cada activo es independiente una vez agrupadas sus operaciones, asi que se envia a los procesos la lista de
+    operaciones de cada ISIN y se recogen los estados FIFO en el mismo orden del portfolio (resultado determinista).
+    """
+
+    def __init__(self, workers: int):
+        self.workers: int = workers
+
+    def run(self, portfolio: Portfolio):
+        """
+        Metodo que calcula el FIFO de todos los activos del portfolio en paralelo y vuelca el resultado en cada Active
+        :param portfolio:
+        :return:
+        """
+        actives: List[Active] = list(portfolio)
+        batches: List[ActiveBatch] = [
+            (active.isin, active.name, [(op.str_date, op.description, op.qty, op.amount) for op in active.operations_list])
+            for active in actives
+        ]
+
+        # -- Varios activos por envio para no pagar la serializacion de una tarea por activo
+        chunksize: int = max(1, len(batches) // (self.workers * 4))
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            states = executor.map(compute_fifo_state, batches, chunksize=chunksize)
+
+            # -- executor.map devuelve los resultados en el orden de envio
+            for active, state in zip(actives, states):
+                active.load_fifo_state(state)
+                active.calculate_fifo_incremental()
@@ -0,0 +1,535 @@
+import datetime
+import math
+import re
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# -- Elemento de texto de una pagina: (texto, x, y, ancho, alto), con y creciendo hacia arriba como en pdf.js
+TextItem = Tuple[str, float, float, float, float]
+TEXT, X, Y, WIDTH, HEIGHT = range(5)
+
+# -- Banda inferior de cada pagina (pie) que se descarta, en puntos
+FOOTER_BOTTOM_BAND: float = 120
+
+# -- Marcadores de inicio y fin de las secciones de movimientos de cuenta (cash) y de fondos monetarios (interest)
+#    en aleman, italiano, ingles y español, ya normalizados como normalize_text (sin acentos y en mayusculas: la
+#    Ü de "Umsatzübersicht" queda como U)
+CASH_START_EXACT: tuple = ("UMSATZUBERSICHT", "TRANSAZIONI SUL CONTO", "ACCOUNT TRANSACTIONS")
+INTEREST_START_EXACT: tuple = ("TRANSAKTIONSUEBERSICHT", "TRANSACTION OVERVIEW", "TRANSACTIONS")
+
+CASH_HEADER_KEYWORDS: tuple = (
+    'DATUM', 'TYP', 'BESCHREIBUNG', 'ZAHLUNGSEINGANG', 'ZAHLUNGSAUSGANG', 'SALDO',
+    'DATA', 'TIPO', 'DESCRIZIONE', 'IN ENTRATA', 'IN USCITA',
+    'DATE', 'TYPE', 'DESCRIPTION', 'MONEY', 'IN', 'OUT', 'BALANCE',
+    'FECHA', 'DESCRIPCION', 'INGRESOS', 'INGRESO', 'EGRESOS', 'EGRESO', 'ABONOS', 'CARGOS', 'ENTRADA', 'SALIDA',
+    'IMPORTE', 'MONTO', 'ENTRADA DE', 'SALIDA DE'
+)
+# -- Cabeceras que agrupan las columnas de entradas y salidas en un solo elemento
+PAYMENTS_HEADER_PAIRS: tuple = (("ZAHLUNGSEINGANG", "ZAHLUNGSAUSGANG"), ("IN ENTRATA", "IN USCITA"),
+                                ("MONEY IN", "MONEY OUT"), ("INGRESOS", "EGRESOS"), ("INGRESO", "EGRESO"),
+                                ("ENTRADA", "SALIDA"))
+INTEREST_HEADER_KEYWORDS: tuple = (
+    'DATUM', 'ZAHLUNGSART', 'GELDMARKTFONDS', 'STUCK', 'STUECK', 'KURS PRO STUCK', 'BETRAG',
+    'FECHA', 'TIPO', 'FONDO', 'FONDOS', 'UNIDADES', 'UNIDAD', 'PRECIO', 'PRECIO POR UNIDAD', 'IMPORTE', 'MONTO'
+)
+
+MONTHS: Dict[str, int] = {
+    # -- español
+    "ene": 1, "enero": 1, "feb": 2, "febrero": 2, "mar": 3, "marzo": 3, "abr": 4, "abril": 4, "may": 5, "mayo": 5,
+    "jun": 6, "junio": 6, "jul": 7, "julio": 7, "ago": 8, "agosto": 8, "sep": 9, "sept": 9, "septiembre": 9,
+    "oct": 10, "octubre": 10, "nov": 11, "noviembre": 11, "dic": 12, "diciembre": 12,
+    # -- ingles
+    "jan": 1, "january": 1, "february": 2, "march": 3, "apr": 4, "april": 4, "june": 6, "july": 7, "aug": 8,
+    "august": 8, "september": 9, "october": 10, "november": 11, "dec": 12, "december": 12,
+    # -- aleman / italiano
+    "mai": 5, "okt": 10, "dez": 12
+}
+
+_DATE_RE = re.compile(r"(\d{1,2})\s+([A-Za-zÀ-Üà-ü.\-]+)\s*(\d{4})?")
+_DATE_LIKE_RE = re.compile(r"\b\d{1,2}\s+[A-Z]{3,}|\b\d{1,2}\.\d{1,2}\.\d{4}", re.IGNORECASE)
+_YEAR_RE = re.compile(r"\b\d{4}\b")
+_NUMBER_PREFIX_RE = re.compile(r"[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?")
+_QTY_RE = re.compile(r"(?:quantity|cantidad|qty|amount|unidades|unidad)[:\s]+([0-9]+[.,]?[0-9]*)", re.IGNORECASE)
+_TRAILING_QTY_RE = re.compile(r",?\s*quantity[:\s]+([0-9]+[.,]?[0-9]*)$", re.IGNORECASE)
+_ISIN_RE = re.compile(r"\b([A-Z]{2}[A-Z0-9]{9}[0-9])\b", re.IGNORECASE)
+_ALT_ISIN_RE = re.compile(r"\b([A-Z]{1,2}[0-9A-Z\-]{6,})\b")
+_ACTION_PREFIX_RE = re.compile(r"^(Savings plan execution|Buy trade|Ejecución Compra directa|Ejecución Compra|"
+                               r"Ejecución Venta directa|Venta|Sell trade|Ejecutar|Operar|Operacion|Operación|"
+                               r"Trade:\s*|Ingreso aceptado:|Ingreso aceptado)\s*", re.IGNORECASE)
+
+
+def normalize_text(text: str) -> str:
+    """
+    Quita acentos, colapsa espacios y pasa a mayusculas
+    """
+    if not text:
+        return ""
+    decomposed: str = unicodedata.normalize("NFD", text)
+    return " ".join("".join(c for c in decomposed if not unicodedata.combining(c)).split()).upper()
+
+
+def is_date_like(text: str) -> bool:
+    """
+    Indica si un texto parece una fecha ('14 ago 2024', '01.01.2025' o contiene un año)
+    """
+    return bool(text) and bool(_DATE_LIKE_RE.search(text) or _YEAR_RE.search(text))
+
+
+def parse_date_to_iso(text: Optional[str]) -> Optional[str]:
+    """
+    Convierte fechas como '14 ago 2024' o '03 DIC' a ISO (sin año se usa el actual)
+    """
+    if not text:
+        return None
+    match = _DATE_RE.search(" ".join(text.split()))
+    if not match:
+        return None
+
+    month_token: str = match.group(2).replace(".", "").lower()
+    month: Optional[int] = MONTHS.get(month_token, MONTHS.get(month_token[:3]))
+    if month is None:
+        return None
+    year: int = int(match.group(3)) if match.group(3) else datetime.date.today().year
+    return f"{year:04d}-{month:02d}-{int(match.group(1)):02d}"
+
+
+def parse_currency(text: Optional[str]) -> float:
+    """
+    Convierte un importe con formato europeo ('1.234,56 €') a float (0 si no es un numero)
+    """
+    if not text:
+        return 0.0
+    clean: str = "".join(text.replace("€", "").split()).replace(".", "").replace(",", ".")
+    match = _NUMBER_PREFIX_RE.match(clean)
+    return float(match.group(0)) if match else 0.0
+
+
+def parse_description_fields(description: str) -> Dict[str, Any]:
+    """
+    Separa de la descripcion de un movimiento el ISIN, el nombre del activo y la cantidad
+    """
+    if not description:
+        return {"description": "", "isin": None, "name": None, "quantity": None}
+    text: str = description.strip()
+
+    # -- 1: Cantidad ("quantity: 0.523494", "cantidad: 0,523"...)
+    quantity: Optional[float] = None
+    qty_match = _QTY_RE.search(text) or _TRAILING_QTY_RE.search(text)
+    if qty_match:
+        quantity = float(qty_match.group(1).replace(",", "."))
+        text = text.replace(qty_match.group(0), "", 1)
+
+    # -- 2: ISIN (2 letras + 9 alfanumericos + 1 digito) u otros identificadores como XF000BTC0017
+    isin: Optional[str] = None
+    isin_match = _ISIN_RE.search(text)
+    if isin_match:
+        isin = isin_match.group(1).upper()
+        text = text.replace(isin_match.group(0), "", 1)
+    else:
+        alt_match = _ALT_ISIN_RE.search(text)
+        if alt_match and re.search(r"[A-Z]{1,2}\d", alt_match.group(1).upper()):
+            isin = alt_match.group(1).upper()
+            text = text.replace(alt_match.group(0), "", 1)
+
+    # -- 3: Nombre: lo que queda sin el prefijo de la accion ni la puntuacion sobrante
+    text = _ACTION_PREFIX_RE.sub("", text, count=1)
+    name: str = re.sub(r"^[\s,:-]+|[\s,:-]+$", "", re.sub(r"\s{2,}", " ", text)).strip()
+
+    return {
+        "description": re.sub(r"\s{2,}", " ", description.strip()),
+        "isin": isin,
+        "name": name or None,
+        "quantity": quantity if quantity is not None and math.isfinite(quantity) else None
+    }
+
+
+def _open_reader(pdf_path: str):
+    """
+    Abre el PDF con pypdf, que solo se necesita para leer extractos en PDF
+    """
+    try:
+        from pypdf import PdfReader
+    except ImportError as e:
+        raise ImportError("Para leer extractos en PDF hace falta pypdf (pip install pypdf)") from e
+    return PdfReader(pdf_path)
+
+
+def extract_page_items(pdf_path: str, page_numbers: List[int]) -> List[List[TextItem]]:
+    """
+    Funcion que se ejecuta en cada proceso: abre el PDF y extrae los elementos de texto con su posicion de las
+    paginas indicadas
+    :param pdf_path:
+    :param page_numbers: Indices de pagina (desde 0)
+    :return: Lista de elementos de cada pagina, en el mismo orden
+    """
+    reader = _open_reader(pdf_path)
+    pages_items: List[List[TextItem]] = []
+
+    for page_number in page_numbers:
+        items: List[TextItem] = []
+
+        def visitor(text: str, cm: List[float], tm: List[float], font_dict: Any, font_size: float):
+            text = text.strip()
+            if not text:
+                return
+            # -- Posicion = matriz de texto x matriz de transformacion actual
+            x: float = tm[4] * cm[0] + tm[5] * cm[2] + cm[4]
+            y: float = tm[4] * cm[1] + tm[5] * cm[3] + cm[5]
+            height: float = abs(font_size * (tm[2] * cm[1] + tm[3] * cm[3])) or font_size
+            items.append((text, x, y, len(text) * height * 0.5, height))
+
+        reader.pages[page_number].extract_text(visitor_text=visitor)
+        pages_items.append(items)
+
+    return pages_items
+
+
+def _find_markers(normalized: List[str]) -> Dict[str, bool]:
+    """
+    Busca en una sola pasada los marcadores de inicio y fin de las secciones en los textos normalizados de una pagina
+    """
+    markers: Dict[str, bool] = {"cash_start": False, "cash_end": False, "interest_start": False, "interest_end": False}
+    for t in normalized:
+        if not markers["cash_start"] and (t in CASH_START_EXACT or ("RESUMEN" in t and "MOVIMIENT" in t)
+                                          or "TRANSACCION" in t or "RESUMEN DE CUENTA" in t):
+            markers["cash_start"] = True
+        if not markers["cash_end"] and ("BARMITTELUEBERSICHT" in t or "CASH SUMMARY" in t or "BALANCE OVERVIEW" in t
+                                        or ("RESUMEN" in t and "SALDO" in t) or "RESUMEN DEL BALANCE" in t
+                                        or t == "SALDO"):
+            markers["cash_end"] = True
+        if not markers["interest_start"] and (t in INTEREST_START_EXACT or ("RESUMEN" in t and "TRANSACC" in t)
+                                              or "DETALLE" in t or "MOVIMIENT" in t):
+            markers["interest_start"] = True
+        if not markers["interest_end"] and ("HINWEISE ZUM KONTOAUSZUG" in t or "NOTES TO ACCOUNT STATEMENT" in t
+                                            or "ACCOUNT STATEMENT NOTES" in t or ("NOTAS" in t and "EXTRACTO" in t)
+                                            or "NOTAS SOBRE" in t):
+            markers["interest_end"] = True
+    return markers
+
+
+def _index_candidates(candidates: List[Tuple[TextItem, str]]) -> Dict[str, Tuple[int, TextItem]]:
+    """
+    Indexa los candidatos a cabecera por su texto normalizado, guardando la primera aparicion en la pagina
+    """
+    by_text: Dict[str, Tuple[int, TextItem]] = {}
+    for position, (item, norm) in enumerate(candidates):
+        by_text.setdefault(norm, (position, item))
+    return by_text
+
+
+def _match_any(by_text: Dict[str, Tuple[int, TextItem]], *labels: str) -> Optional[TextItem]:
+    """
+    Devuelve el primer candidato (en orden de pagina) cuyo texto normalizado es alguna de las etiquetas
+    """
+    found: List[Tuple[int, TextItem]] = [by_text[label] for label in labels if label in by_text]
+    return min(found, key=lambda match: match[0])[1] if found else None
+
+
+def find_cash_headers(items: List[TextItem], normalized: List[str]) -> Optional[Dict[str, TextItem]]:
+    """
+    Busca las cabeceras de la tabla de movimientos de cuenta (en cualquiera de los idiomas soportados)
+    :param items: Elementos de la pagina
+    :param normalized: Textos normalizados de los elementos (mismo orden)
+    :return: Cabecera de cada columna o None si la pagina no tiene la tabla
+    """
+    # -- 1: Candidatos a cabecera: textos en mayusculas que contienen alguna palabra clave
+    candidates: List[Tuple[TextItem, str]] = [
+        (item, norm) for item, norm in zip(items, normalized)
+        if len(item[TEXT]) > 2 and (item[TEXT] == item[TEXT].upper() or "FECHA" in norm or "TIPO" in norm)
+        and any(keyword in norm for keyword in CASH_HEADER_KEYWORDS)
+    ]
+    by_text: Dict[str, Tuple[int, TextItem]] = _index_candidates(candidates)
+
+    def find_composite(first: str, second: str) -> Optional[TextItem]:
+        # -- Cabeceras que el PDF parte en dos elementos, como "MONEY" + "IN"
+        single: Optional[TextItem] = _match_any(by_text, f"{first} {second}", f"{first}{second}")
+        if single:
+            return single
+        for item, norm in candidates:
+            if norm != first:
+                continue
+            for other, other_norm in candidates:
+                if other_norm == second and abs(other[Y] - item[Y]) < 2 and item[X] < other[X] < item[X] + 100:
+                    return (f"{first} {second}", item[X], item[Y], other[X] + other[WIDTH] - item[X],
+                            max(item[HEIGHT], other[HEIGHT]))
+        return None
+
+    # -- 2: Cabecera de cada columna
+    headers: Dict[str, Optional[TextItem]] = {
+        "DATUM": _match_any(by_text, "DATUM", "DATA", "DATE", "FECHA"),
+        "TYP": _match_any(by_text, "TYP", "TIPO", "TYPE"),
+        "BESCHREIBUNG": _match_any(by_text, "BESCHREIBUNG", "DESCRIZIONE", "DESCRIPTION", "DESCRIPCION"),
+        "ZAHLUNGEN": next((item for item, norm in candidates
+                           if any(a in norm and b in norm for a, b in PAYMENTS_HEADER_PAIRS)), None),
+        "ZAHLUNGSEINGANG": None,
+        "ZAHLUNGSAUSGANG": None,
+        "SALDO": _match_any(by_text, "SALDO", "BALANCE"),
+    }
+    if not headers["ZAHLUNGEN"]:
+        headers["ZAHLUNGSEINGANG"] = (_match_any(by_text, "ZAHLUNGSEINGANG", "IN ENTRATA", "INGRESOS", "INGRESO",
+                                                 "ENTRADA", "ENTRADA DE") or find_composite("MONEY", "IN"))
+        headers["ZAHLUNGSAUSGANG"] = (_match_any(by_text, "ZAHLUNGSAUSGANG", "IN USCITA", "EGRESOS", "EGRESO",
+                                                 "SALIDA", "SALIDA DE") or find_composite("MONEY", "OUT"))
+
+    if not (headers["DATUM"] and headers["TYP"] and headers["BESCHREIBUNG"] and headers["SALDO"]):
+        return None
+    if not headers["ZAHLUNGEN"] and not (headers["ZAHLUNGSEINGANG"] and headers["ZAHLUNGSAUSGANG"]):
+        return None
+    return headers
+
+
+def cash_column_boundaries(headers: Dict[str, TextItem]) -> Dict[str, Any]:
+    """
+    Calcula los limites horizontales de cada columna de la tabla de movimientos a partir de sus cabeceras
+    """
+    if headers["ZAHLUNGEN"]:
+        midpoint: float = headers["ZAHLUNGEN"][X] + headers["ZAHLUNGEN"][WIDTH] / 2
+        incoming_end, outgoing_start = midpoint, midpoint
+        payments_start: float = headers["ZAHLUNGEN"][X] - 5
+    else:
+        incoming_end = outgoing_start = headers["ZAHLUNGSAUSGANG"][X] - 5
+        payments_start = headers["ZAHLUNGSEINGANG"][X] - 5
+
+    return {
+        "columns": [("datum", headers["TYP"][X] - 5), ("typ", headers["BESCHREIBUNG"][X] - 5),
+                    ("beschreibung", payments_start)],
+        "amounts": [("zahlungseingang", incoming_end), ("zahlungsausgang", headers["SALDO"][X] - 5)],
+        "last": "saldo",
+        "header_y": headers["DATUM"][Y],
+    }
+
+
+def find_interest_headers(items: List[TextItem], normalized: List[str]) -> Optional[Dict[str, TextItem]]:
+    """
+    Busca las cabeceras de la tabla de transacciones de fondos monetarios
+    """
+    by_text: Dict[str, Tuple[int, TextItem]] = _index_candidates([
+        (item, norm) for item, norm in zip(items, normalized)
+        if len(item[TEXT]) > 2 and any(keyword in norm for keyword in INTEREST_HEADER_KEYWORDS)
+    ])
+
+    def match_first(*groups: tuple) -> Optional[TextItem]:
+        # -- Cada grupo de etiquetas tiene prioridad sobre los siguientes
+        for labels in groups:
+            found: Optional[TextItem] = _match_any(by_text, *labels)
+            if found:
+                return found
+        return None
+
+    headers: Dict[str, Optional[TextItem]] = {
+        "DATUM": match_first(("DATUM",), ("FECHA",)),
+        "ZAHLUNGSART": match_first(("ZAHLUNGSART",), ("TIPO",), ("TIPO DE PAGO",)),
+        "GELDMARKTFONDS": match_first(("GELDMARKTFONDS",), ("FONDO",), ("FONDOS",), ("FONDO DEL MERCADO MONETARIO",)),
+        "STUECK": match_first(("STUCK", "STUECK"), ("UNIDADES", "UNIDAD", "CANTIDAD")),
+        "KURS": match_first(("KURS PRO STUCK",), ("PRECIO POR UNIDAD",), ("PRECIO",), ("PRECIO/UNIDAD",)),
+        "BETRAG": match_first(("BETRAG",), ("IMPORTE",), ("MONTO",)),
+    }
+    if not all(headers.values()):
+        return None
+    return headers
+
+
+def interest_column_boundaries(headers: Dict[str, TextItem]) -> Dict[str, Any]:
+    """
+    Calcula los limites horizontales de cada columna de la tabla de fondos monetarios
+    """
+    return {
+        "columns": [("datum", headers["ZAHLUNGSART"][X] - 5), ("zahlungsart", headers["GELDMARKTFONDS"][X] - 5),
+                    ("geldmarktfonds", headers["STUECK"][X] - 5)],
+        "amounts": [("stueck", headers["KURS"][X] - 5), ("kurs", headers["BETRAG"][X] - 5)],
+        "last": "betrag",
+        "header_y": headers["DATUM"][Y],
+    }
+
+
+def group_rows(items: List[TextItem]) -> List[List[TextItem]]:
+    """
+    Agrupa los elementos en filas: cubetas por coordenada y (de arriba a abajo, cada una ordenada por x) y se
+    unen las cubetas consecutivas separadas menos de 1.5 veces la altura media (descripciones en varias lineas)
+    :param items:
+    :return:
+    """
+    if not items:
+        return []
+
+    buckets: Dict[float, List[TextItem]] = {}
+    for item in items:
+        buckets.setdefault(item[Y], []).append(item)
+
+    gap_threshold: float = (sum(item[HEIGHT] for item in items) / len(items) or 10) * 1.5
+    rows: List[List[TextItem]] = []
+    previous_y: Optional[float] = None
+    for y in sorted(buckets, reverse=True):
+        bucket: List[TextItem] = sorted(buckets[y], key=lambda item: item[X])
+        if previous_y is None or previous_y - y > gap_threshold:
+            rows.append(bucket)
+        else:
+            rows[-1].extend(bucket)
+        previous_y = y
+    return rows
+
+
+def extract_transactions(items: List[TextItem], boundaries: Dict[str, Any]) -> List[Dict[str, str]]:
+    """
+    Extrae las filas de una tabla (movimientos o fondos) de una pagina segun los limites de sus columnas
+    :param items: Elementos de la pagina
+    :param boundaries: Limites devueltos por cash_column_boundaries o interest_column_boundaries
+    :return: Una transaccion (columna -> texto) por fila
+    """
+    header_y: float = boundaries["header_y"] - 5
+    content: List[TextItem] = [item for item in items if item[Y] < header_y and item[TEXT].strip()]
+    columns: List[Tuple[str, float]] = boundaries["columns"]
+    amounts: List[Tuple[str, float]] = boundaries["amounts"]
+
+    transactions: List[Dict[str, str]] = []
+    for row in group_rows(content):
+        parts: Dict[str, List[str]] = {name: [] for name, _ in columns + amounts}
+        parts[boundaries["last"]] = []
+        trailing: List[TextItem] = []
+
+        # -- 1: Columnas de texto por limite; el resto son importes
+        for item in row:
+            for name, end in columns:
+                if item[X] < end:
+                    parts[name].append(item[TEXT])
+                    break
+            else:
+                trailing.append(item)
+
+        # -- 2: El importe mas a la derecha es la ultima columna (saldo/importe); los demas, por limite
+        trailing.sort(key=lambda item: item[X])
+        if trailing:
+            parts[boundaries["last"]].append(trailing.pop()[TEXT])
+        for item in trailing:
+            for name, end in amounts:
+                if item[X] < end:
+                    parts[name].append(item[TEXT])
+                    break
+
+        transaction: Dict[str, str] = {name: " ".join(" ".join(texts).split()) for name, texts in parts.items()}
+
+        # -- 3: Descarto las filas que no parecen transacciones (sin fecha reconocible y sin saldo; las de fondos no
+        #       tienen saldo, asi que necesitan la fecha)
+        if not is_date_like(transaction[columns[0][0]]) and not transaction.get("saldo"):
+            continue
+        if any(transaction.values()):
+            transactions.append(transaction)
+
+    return transactions
+
+
+def map_cash(transaction: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Convierte un movimiento de cuenta al formato de fila de extracto que consume Main
+    """
+    parsed: Dict[str, Any] = parse_description_fields(transaction["beschreibung"])
+    return {
+        "date": transaction["datum"] or None,
+        "date_iso": parse_date_to_iso(transaction["datum"]),
+        "type": transaction["typ"] or None,
+        "description": parsed["description"],
+        "isin": parsed["isin"],
+        "name": parsed["name"],
+        "quantity": parsed["quantity"],
+        "incoming": transaction["zahlungseingang"] or None,
+        "incoming_amount": parse_currency(transaction["zahlungseingang"]),
+        "outgoing": transaction["zahlungsausgang"] or None,
+        "outgoing_amount": parse_currency(transaction["zahlungsausgang"]),
+        "balance": transaction["saldo"] or None,
+        "balance_amount": parse_currency(transaction["saldo"]),
+    }
+
+
+def map_interest(transaction: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Convierte una transaccion de fondos monetarios a formato de salida
+    """
+    return {
+        "date": transaction["datum"] or None,
+        "type": transaction["zahlungsart"] or "Interest",
+        "description": transaction["geldmarktfonds"] or None,
+        "amount": transaction["betrag"] or None,
+        "quantity": transaction["stueck"] or None,
+        "price_per_unit": transaction["kurs"] or None,
+    }
+
+
+def _chunk_pages(n_pages: int, workers: int) -> List[List[int]]:
+    chunk_size: int = max(1, math.ceil(n_pages / (workers * 4)))
+    return [list(range(start, min(start + chunk_size, n_pages))) for start in range(0, n_pages, chunk_size)]
+
+
+def parse_pdf(pdf_path: str, workers: int = 1, footer_band: float = FOOTER_BOTTOM_BAND) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Lee un extracto de cuenta de Trade Republic en PDF y devuelve sus movimientos de cuenta y de fondos monetarios
+    (misma logica que parsePDF de js/parser.js).
+
+    La extraccion de texto, que es lo costoso, se reparte por paginas entre varios procesos; despues se recorren
+    las paginas en orden porque los limites de columna de una tabla se arrastran de una pagina a la siguiente.
+    :param pdf_path:
+    :param workers: Numero de procesos para extraer las paginas (1 = en este proceso)
+    :param footer_band: Banda inferior de cada pagina (pie) que se descarta, en puntos
+    :return: {"cash": [...], "interest": [...]}
+    """
+    # -- 1: Texto posicionado de cada pagina
+    n_pages: int = len(_open_reader(pdf_path).pages)
+    if workers > 1 and n_pages > 1:
+        chunks: List[List[int]] = _chunk_pages(n_pages, workers)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pages: List[List[TextItem]] = [items for chunk_items in executor.map(
+                extract_page_items, [pdf_path] * len(chunks), chunks) for items in chunk_items]
+    else:
+        pages = extract_page_items(pdf_path, list(range(n_pages)))
+
+    # -- 2: Recorro las paginas en orden detectando secciones y cabeceras
+    cash: List[Dict[str, str]] = []
+    interest: List[Dict[str, str]] = []
+    cash_boundaries: Optional[Dict[str, Any]] = None
+    interest_boundaries: Optional[Dict[str, Any]] = None
+    parsing_cash: bool = False
+    parsing_interest: bool = False
+
+    for page_items in pages:
+        items: List[TextItem] = [item for item in page_items if item[Y] > footer_band]
+        normalized: List[str] = [normalize_text(item[TEXT]) for item in items]
+        markers: Dict[str, bool] = _find_markers(normalized)
+
+        process_cash: bool = parsing_cash or markers["cash_start"]
+        if process_cash:
+            cash_headers = find_cash_headers(items, normalized)
+            if cash_headers:
+                cash_boundaries = cash_column_boundaries(cash_headers)
+            if cash_boundaries:
+                cash.extend(extract_transactions(items, cash_boundaries))
+        if markers["cash_end"]:
+            parsing_cash, cash_boundaries = False, None
+        elif process_cash:
+            parsing_cash = True
+
+        process_interest: bool = parsing_interest or markers["interest_start"]
+        if process_interest:
+            interest_headers = find_interest_headers(items, normalized)
+            if interest_headers:
+                interest_boundaries = interest_column_boundaries(interest_headers)
+            if interest_boundaries:
+                interest.extend(extract_transactions(items, interest_boundaries))
+        if markers["interest_end"]:
+            parsing_interest, interest_boundaries = False, None
+        elif process_interest:
+            parsing_interest = True
+
+    return {"cash": [map_cash(tx) for tx in cash], "interest": [map_interest(tx) for tx in interest]}
+
+
+def iter_pdf_rows(pdf_path: str, workers: int = 1) -> Iterator[Dict[str, Any]]:
+    """
+    Generador con las filas de movimientos de cuenta de un extracto PDF en el formato que consume Main. Las filas
+    sin ISIN o sin cantidad (ingresos, intereses...) no pueden ser operaciones y se omiten
+    :param pdf_path:
+    :param workers:
+    :return:
+    """
+    for row in parse_pdf(pdf_path, workers=workers)["cash"]:
+        if row["isin"] and row["quantity"] is not None and row["date_iso"]:
+            yield row
@@ -0,0 +1,137 @@
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional
+
+from app.dates import iso_to_ordinal
+
+# -- Posiciones de cada acumulado dentro de los vectores de totales
+GROSS, NET, COMISSIONS, TAXES, N_SALES = range(5)
+TOTAL_FIELDS: tuple = ("gross_profit", "net_profit", "comissions", "taxes", "n_sales")
+
+
+def _empty_totals() -> List[float]:
+    return [0.0, 0.0, 0.0, 0.0, 0]
+
+
+def totals_to_dict(totals: List[float]) -> Dict[str, float]:
+    """
+    Convierte un vector de totales a diccionario
+    """
+    return dict(zip(TOTAL_FIELDS, totals))
+
+
+class PnLIndex:
+    """
+    Indice de resultado realizado por periodo.
+
+    Se alimenta venta a venta durante el calculo FIFO y mantiene acumulados por año, por mes y por dia (beneficio
+    bruto y neto, comisiones e impuestos de las ventas y numero de ventas), de forma que consultar un año o un mes
+    es O(1) y un rango de fechas arbitrario se resuelve con sumas prefijas y busqueda binaria.
+    """
+
+    __slots__ = ("by_year", "by_month", "by_day", "_days", "_prefix")
+
+    def __init__(self):
+
+        # -- 1: Acumulados por año (int), mes ("YYYY-MM") y dia (ordinal)
+        self.by_year: Dict[int, List[float]] = {}
+        self.by_month: Dict[str, List[float]] = {}
+        self.by_day: Dict[int, List[float]] = {}
+
+        # -- 2: Dias ordenados y sumas prefijas para las consultas por rango (se construyen bajo demanda)
+        self._days: Optional[List[int]] = None
+        self._prefix: Optional[List[List[float]]] = None
+
+    def add_sale(self, str_date: str, date_ordinal: int, gross_profit: float, net_profit: float, comissions: float,
+                 taxes: float):
+        """
+        Metodo que acumula una venta en su año, mes y dia
+        :param str_date: Fecha ISO de la venta
+        :param date_ordinal: Ordinal de la fecha
+        :param gross_profit:
+        :param net_profit:
+        :param comissions:
+        :param taxes:
+        :return:
+        """
+        values: tuple = (gross_profit, net_profit, comissions, taxes, 1)
+        for buckets, key in ((self.by_year, int(str_date[:4])), (self.by_month, str_date[:7]),
+                             (self.by_day, date_ordinal)):
+            totals: Optional[List[float]] = buckets.get(key)
+            if totals is None:
+                totals = buckets[key] = _empty_totals()
+            for idx, value in enumerate(values):
+                totals[idx] += value
+
+        self._days = None
+        self._prefix = None
+
+    def merge(self, other: "PnLIndex"):
+        """
+        Metodo que suma otro indice a este (p.ej. para agregar todos los activos de un portfolio)
+        :param other:
+        :return:
+        """
+        for own_buckets, other_buckets in ((self.by_year, other.by_year), (self.by_month, other.by_month),
+                                           (self.by_day, other.by_day)):
+            for key, other_totals in other_buckets.items():
+                totals: Optional[List[float]] = own_buckets.get(key)
+                if totals is None:
+                    totals = own_buckets[key] = _empty_totals()
+                for idx, value in enumerate(other_totals):
+                    totals[idx] += value
+
+        self._days = None
+        self._prefix = None
+
+    def year(self, year: int) -> Dict[str, float]:
+        """
+        Metodo que devuelve los totales de un año fiscal
+        """
+        return totals_to_dict(self.by_year.get(year, _empty_totals()))
+
+    def month(self, year_month: str) -> Dict[str, float]:
+        """
+        Metodo que devuelve los totales de un mes ("YYYY-MM")
+        """
+        return totals_to_dict(self.by_month.get(year_month, _empty_totals()))
+
+    def date_range(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> Dict[str, float]:
+        """
+        Metodo que devuelve los totales de las ventas entre dos fechas ISO (ambas incluidas; None = sin limite)
+        :param start_date:
+        :param end_date:
+        :return:
+        """
+        if self._prefix is None:
+            self._build_prefix_sums()
+
+        days: List[int] = self._days
+        lo: int = bisect_left(days, iso_to_ordinal(start_date)) if start_date else 0
+        hi: int = bisect_right(days, iso_to_ordinal(end_date)) if end_date else len(days)
+        if hi <= lo:
+            return totals_to_dict(_empty_totals())
+        return totals_to_dict([end - start for start, end in zip(self._prefix[lo], self._prefix[hi])])
+
+    def _build_prefix_sums(self):
+        """
+        Metodo que ordena los dias con ventas y calcula las sumas prefijas de sus totales
+        """
+        self._days = sorted(self.by_day)
+        running: List[float] = _empty_totals()
+        self._prefix = [list(running)]
+        for day in self._days:
+            for idx, value in enumerate(self.by_day[day]):
+                running[idx] += value
+            self._prefix.append(list(running))
+
+    def years_to_dict(self) -> Dict[str, Dict[str, float]]:
+        """
+        Devuelve los totales por año ordenados cronologicamente
+        """
+        return {str(year): totals_to_dict(self.by_year[year]) for year in sorted(self.by_year)}
+
+    def months_to_dict(self) -> Dict[str, Dict[str, float]]:
+        """
+        Devuelve los totales por mes ordenados cronologicamente
+        """
+        return {month: totals_to_dict(self.by_month[month]) for month in sorted(self.by_month)}
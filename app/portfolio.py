@@ -0,0 +1,170 @@
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from app.data_classes import Active, BuyOperation
+from app.pnl_index import PnLIndex
+
+
+class Portfolio:
+    """
+    Registro de activos indexado por ISIN.
+
+    Mantiene el orden de insercion (el del extracto) para los reportes y exportaciones, y permite buscar
+    activos por ISIN en O(1) o por prefijo de nombre/ISIN.
+    """
+
+    def __init__(self):
+
+        # -- 1: Diccionario ISIN -> Active (los dict de Python conservan el orden de insercion)
+        self.actives_by_isin: Dict[str, Active] = {}
+
+    def get(self, isin: str) -> Optional[Active]:
+        """
+        Metodo que devuelve el activo asociado a un ISIN o None si no existe
+        :param isin:
+        :return:
+        """
+        return self.actives_by_isin.get(isin)
+
+    def get_or_create(self, isin: str, name: str) -> Active:
+        """
+        Metodo que devuelve el activo asociado a un ISIN, creandolo si aun no existe
+        :param isin:
+        :param name:
+        :return:
+        """
+        active: Optional[Active] = self.actives_by_isin.get(isin)
+        if active is None:
+            active = Active(isin=isin, name=name)
+            self.actives_by_isin[isin] = active
+        return active
+
+    def ingest(self, rows: Iterable[Dict[str, Any]], allowed_types: List[str], excluded_initial_isin: List[str]) -> int:
+        """
+        Metodo que recorre las filas de un extracto, aplica las restricciones y agrega cada operacion a su activo
+        :param rows: Filas del extracto (date_iso, type, description, isin, name, quantity, incoming_amount, outgoing_amount)
+        :param allowed_types: Tipos de fila que se procesan
+        :param excluded_initial_isin: Prefijos de ISIN que se descartan
+        :return: Numero de operaciones agregadas
+        """
+        excluded_prefixes: tuple = tuple(excluded_initial_isin)
+        n_operations: int = 0
+
+        for elem in rows:
+            elem_isin: str = elem["isin"]
+
+            # -- 1: Aplico restricciones
+            if elem["type"] not in allowed_types:
+                continue
+            if excluded_prefixes and elem_isin.startswith(excluded_prefixes):
+                continue
+
+            # -- 2: Importe de la operacion
+            # Nota: incoming_amount > 0 suele ser venta (entra dinero), outgoing_amount > 0 suele ser compra (sale dinero)
+            elem_outgoing_amount: float = elem["outgoing_amount"]
+            amount: float = elem_outgoing_amount if elem_outgoing_amount > 0 else elem["incoming_amount"]
+
+            # -- 3: Buscamos el activo por ISIN y, si no existe, lo creamos
+            # Si es una venta y no existe el activo, podría ser un error de datos o una venta en corto (no soportada explícitamente pero la creamos igual)
+            active: Active = self.get_or_create(isin=elem_isin, name=elem["name"])
+
+            # -- 4: add_operation ya se encarga de crear BuyOperation o SellOperation y de actualizar current_qty
+            active.add_operation(
+                isin=elem_isin,
+                str_date=elem["date_iso"],
+                description=elem["description"],
+                qty=elem["quantity"],
+                amount=amount
+            )
+            n_operations += 1
+
+        return n_operations
+
+    def realized(self, isin: Optional[str] = None, year: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Consulta el resultado realizado (ventas cerradas) de un ISIN y/o de un año fiscal. Solo calcula el FIFO de
+        los activos consultados, y lo reutiliza mientras no se agreguen operaciones
+        :param isin: ISIN a consultar (None = todos los activos)
+        :param year: Año de la venta (None = todos los años)
+        :return: Beneficio bruto y neto, comisiones e impuestos de las ventas y numero de ventas
+        """
+        actives: List[Active] = self._select(isin)
+        result: Dict[str, Any] = {"gross_profit": 0.0, "net_profit": 0.0, "comissions": 0.0, "taxes": 0.0, "n_sales": 0}
+
+        for active in actives:
+            pnl_index: PnLIndex = active.ensure_fifo().pnl_index
+            totals: Dict[str, float] = pnl_index.year(year) if year is not None else pnl_index.date_range()
+            for key in result:
+                result[key] += totals[key]
+
+        return result
+
+    def pnl_index(self) -> PnLIndex:
+        """
+        Devuelve el indice de resultado realizado de todo el portfolio (suma de los indices de cada activo)
+        """
+        portfolio_index: PnLIndex = PnLIndex()
+        for active in self.actives_by_isin.values():
+            portfolio_index.merge(active.ensure_fifo().pnl_index)
+        return portfolio_index
+
+    def period_summary(self) -> Dict[str, Any]:
+        """
+        Devuelve el resumen de resultado realizado por año y mes, del portfolio completo y de cada ISIN
+        """
+        portfolio_index: PnLIndex = self.pnl_index()
+        return {
+            "by_year": portfolio_index.years_to_dict(),
+            "by_month": portfolio_index.months_to_dict(),
+            "by_isin": {
+                active.isin: {
+                    "name": active.name,
+                    "by_year": active.pnl_index.years_to_dict(),
+                    "by_month": active.pnl_index.months_to_dict()
+                }
+                for active in self.actives_by_isin.values()
+            }
+        }
+
+    def open_lots(self, isin: Optional[str] = None) -> List[BuyOperation]:
+        """
+        Consulta los lotes de compra que siguen abiertos de un ISIN (None = todos los activos)
+        :param isin:
+        :return:
+        """
+        return [op for active in self._select(isin) for op in active.ensure_fifo().opened_operations_list]
+
+    def _select(self, isin: Optional[str]) -> List[Active]:
+        """
+        Devuelve los activos sobre los que se hace una consulta (lanza ValueError si el ISIN no existe)
+        """
+        if isin is None:
+            return list(self.actives_by_isin.values())
+        if isin not in self.actives_by_isin:
+            raise ValueError(f"ISIN no encontrado: {isin}")
+        return [self.actives_by_isin[isin]]
+
+    def find_by_isin_prefix(self, prefix: str) -> List[Active]:
+        """
+        Metodo que devuelve los activos cuyo ISIN empieza por el prefijo indicado (p.ej. "IE")
+        :param prefix:
+        :return:
+        """
+        return [active for isin, active in self.actives_by_isin.items() if isin.startswith(prefix)]
+
+    def find_by_name_prefix(self, prefix: str) -> List[Active]:
+        """
+        Metodo que devuelve los activos cuyo nombre empieza por el prefijo indicado (sin distinguir mayusculas)
+        :param prefix:
+        :return:
+        """
+        prefix_lower: str = prefix.lower()
+        return [active for active in self.actives_by_isin.values() if active.name.lower().startswith(prefix_lower)]
+
+    def __contains__(self, isin: str) -> bool:
+        return isin in self.actives_by_isin
+
+    def __iter__(self) -> Iterator[Active]:
+        return iter(self.actives_by_isin.values())
+
+    def __len__(self) -> int:
+        return len(self.actives_by_isin)
@@ -0,0 +1,278 @@
+import csv
+import datetime
+import glob
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.data_classes import BuyOperation
+from app.dates import iso_to_ordinal
+from app.money import QTY_SCALE, qty_to_units
+from app.portfolio import Portfolio
+
+# -- Nombres de columna admitidos en los CSV de precios (sin distinguir mayusculas)
+DATE_COLUMNS: tuple = ("date", "date_iso", "fecha")
+CLOSE_COLUMNS: tuple = ("close", "adj close", "cierre", "price")
+ISIN_COLUMNS: tuple = ("isin",)
+
+
+def _find_column(header: List[str], candidates: tuple) -> Optional[int]:
+    lowered: List[str] = [column.strip().lower() for column in header]
+    for candidate in candidates:
+        if candidate in lowered:
+            return lowered.index(candidate)
+    return None
+
+
+class PriceStore:
+    """
+    Historico local de precios de cierre diarios por ISIN, para valorar la cartera sin acceso a red.
+
+    Cada ISIN se guarda en dos ficheros .npy (fechas como ordinales ordenados y cierres) que se abren como memoria
+    mapeada, asi que cargar el historico de muchos activos no lee los ficheros enteros. Las consultas por fecha usan
+    busqueda binaria (searchsorted) y devuelven el ultimo cierre disponible en o antes de la fecha pedida.
+    """
+
+    def __init__(self, store_dir: str = "data/prices"):
+        self.store_dir: str = store_dir
+
+        # -- Series ya abiertas: ISIN -> (fechas, cierres)
+        self._series: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+    def _paths(self, isin: str) -> Tuple[str, str]:
+        return (os.path.join(self.store_dir, f"{isin}.dates.npy"),
+                os.path.join(self.store_dir, f"{isin}.close.npy"))
+
+    def import_csv(self, csv_path: str, isin: Optional[str] = None) -> Dict[str, int]:
+        """
+        Metodo que importa un volcado CSV de precios (columnas fecha y cierre, y opcionalmente isin). Si el CSV no
+        tiene columna isin, el ISIN es el parametro o, en su defecto, el nombre del fichero. Los precios se mezclan
+        con los ya guardados (para una misma fecha gana el del CSV)
+        :param csv_path:
+        :param isin:
+        :return: Numero de precios importados por ISIN
+        """
+        rows_by_isin: Dict[str, Dict[int, float]] = {}
+        with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.reader(f)
+            header: List[str] = next(reader)
+            date_col: Optional[int] = _find_column(header, DATE_COLUMNS)
+            close_col: Optional[int] = _find_column(header, CLOSE_COLUMNS)
+            isin_col: Optional[int] = _find_column(header, ISIN_COLUMNS)
+            if date_col is None or close_col is None:
+                raise ValueError(f"El CSV {csv_path} necesita columnas de fecha y cierre: {header}")
+
+            default_isin: str = isin or os.path.splitext(os.path.basename(csv_path))[0]
+            for row in reader:
+                # -- Las filas sin cierre (festivos en los volcados de Yahoo: "null") se descartan
+                try:
+                    close: float = float(row[close_col])
+                except (ValueError, IndexError):
+                    continue
+                row_isin: str = row[isin_col] if isin_col is not None else default_isin
+                rows_by_isin.setdefault(row_isin, {})[iso_to_ordinal(row[date_col][:10])] = close
+
+        for row_isin, prices in rows_by_isin.items():
+            self._merge(row_isin, prices)
+        return {row_isin: len(prices) for row_isin, prices in rows_by_isin.items()}
+
+    def import_dir(self, csv_dir: str) -> Dict[str, int]:
+        """
+        Metodo que importa todos los CSV de un directorio
+        :param csv_dir:
+        :return: Numero de precios importados por ISIN
+        """
+        imported: Dict[str, int] = {}
+        for csv_path in sorted(glob.glob(os.path.join(csv_dir, "*.csv"))):
+            for isin, n_prices in self.import_csv(csv_path).items():
+                imported[isin] = imported.get(isin, 0) + n_prices
+        return imported
+
+    def _merge(self, isin: str, prices: Dict[int, float]):
+        """
+        Metodo que mezcla precios nuevos con la serie guardada de un ISIN y la reescribe ordenada por fecha
+        """
+        # -- La serie guardada se lee sin mapear y se suelta la mapeada de la cache: en Windows no se puede reemplazar
+        #    un fichero que sigue mapeado en memoria
+        self._series.pop(isin, None)
+        merged: Dict[int, float] = {}
+        dates_path, close_path = self._paths(isin)
+        if os.path.exists(dates_path):
+            merged = dict(zip(np.load(dates_path).tolist(), np.load(close_path).tolist()))
+        merged.update(prices)
+
+        dates: np.ndarray = np.fromiter(sorted(merged), dtype=np.int32, count=len(merged))
+        closes: np.ndarray = np.fromiter((merged[date] for date in dates.tolist()), dtype=np.float64, count=len(merged))
+
+        os.makedirs(self.store_dir, exist_ok=True)
+        for path, array in zip(self._paths(isin), (dates, closes)):
+            tmp_path: str = f"{path}.tmp.npy"
+            np.save(tmp_path, array)
+            os.replace(tmp_path, path)
+
+    def isins(self) -> List[str]:
+        """
+        Devuelve los ISIN con precios guardados
+        """
+        if not os.path.isdir(self.store_dir):
+            return []
+        return sorted(file_name[:-len(".dates.npy")] for file_name in os.listdir(self.store_dir)
+                      if file_name.endswith(".dates.npy"))
+
+    def series(self, isin: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Metodo que devuelve la serie (fechas como ordinales, cierres) de un ISIN o None si no hay precios
+        :param isin:
+        :return:
+        """
+        cached: Optional[Tuple[np.ndarray, np.ndarray]] = self._series.get(isin)
+        if cached is not None:
+            return cached
+
+        dates_path, close_path = self._paths(isin)
+        if not os.path.exists(dates_path):
+            return None
+        series: Tuple[np.ndarray, np.ndarray] = (np.load(dates_path, mmap_mode="r"), np.load(close_path, mmap_mode="r"))
+        self._series[isin] = series
+        return series
+
+    def prices_on(self, isin: str, date_ordinals: np.ndarray) -> np.ndarray:
+        """
+        Metodo que devuelve, para cada fecha, el ultimo cierre del ISIN en o antes de esa fecha (NaN si no hay)
+        :param isin:
+        :param date_ordinals: Fechas como ordinales
+        :return:
+        """
+        date_ordinals = np.asarray(date_ordinals)
+        series: Optional[Tuple[np.ndarray, np.ndarray]] = self.series(isin)
+        if series is None or not len(series[0]):
+            return np.full(date_ordinals.shape, np.nan)
+
+        dates, closes = series
+        positions: np.ndarray = np.searchsorted(dates, date_ordinals, side="right") - 1
+        return np.where(positions >= 0, np.asarray(closes)[np.maximum(positions, 0)], np.nan)
+
+    def price_on(self, isin: str, str_date: str) -> Optional[float]:
+        """
+        Metodo que devuelve el ultimo cierre del ISIN en o antes de una fecha ISO (None si no hay)
+        """
+        price: float = float(self.prices_on(isin, np.array([iso_to_ordinal(str_date)]))[0])
+        return None if np.isnan(price) else price
+
+    def unrealized_pnl(self, portfolio: Portfolio, str_date: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Metodo que valora los lotes abiertos del portfolio a precio de mercado
+        :param portfolio:
+        :param str_date: Fecha de valoracion (por defecto hoy); se usa el ultimo cierre disponible hasta esa fecha
+        :return: Lotes valorados, totales por ISIN y totales del portfolio. Los ISIN sin precio se listan aparte y
+        no suman en los totales
+        """
+        str_date = str_date or datetime.date.today().isoformat()
+        valuation_ordinal: int = iso_to_ordinal(str_date)
+        lots: List[Dict[str, Any]] = []
+        by_isin: Dict[str, Dict[str, Any]] = {}
+        missing_prices: List[str] = []
+
+        for active in portfolio:
+            open_lots = active.ensure_fifo().opened_operations_list
+            if not open_lots:
+                continue
+
+            price: float = float(self.prices_on(active.isin, np.array([valuation_ordinal]))[0])
+            if np.isnan(price):
+                missing_prices.append(active.isin)
+                continue
+
+            # -- Valoracion vectorizada de todos los lotes del activo
+            qtys: np.ndarray = np.fromiter((op.qty for op in open_lots), dtype=np.float64, count=len(open_lots))
+            buy_prices: np.ndarray = np.fromiter((op.buy_price for op in open_lots), dtype=np.float64, count=len(open_lots))
+            cost: np.ndarray = qtys * buy_prices
+            market_value: np.ndarray = qtys * price
+            unrealized: np.ndarray = market_value - cost
+
+            for op, lot_cost, lot_value, lot_pnl in zip(open_lots, cost.tolist(), market_value.tolist(), unrealized.tolist()):
+                lots.append({
+                    "isin": active.isin,
+                    "name": active.name,
+                    "buy_date": op.str_date,
+                    "qty": op.qty,
+                    "buy_price": op.buy_price,
+                    "price": price,
+                    "cost": lot_cost,
+                    "market_value": lot_value,
+                    "unrealized_pnl": lot_pnl
+                })
+
+            by_isin[active.isin] = {
+                "name": active.name,
+                "qty": float(qtys.sum()),
+                "price": price,
+                "cost": float(cost.sum()),
+                "market_value": float(market_value.sum()),
+                "unrealized_pnl": float(unrealized.sum())
+            }
+
+        return {
+            "valuation_date": str_date,
+            "lots": lots,
+            "by_isin": by_isin,
+            "totals": {
+                key: sum(totals[key] for totals in by_isin.values())
+                for key in ("cost", "market_value", "unrealized_pnl")
+            },
+            "missing_prices": missing_prices
+        }
+
+    def daily_value_series(self, portfolio: Portfolio, start_date: Optional[str] = None,
+                           end_date: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Metodo que calcula el valor diario de la cartera a partir del historico de operaciones: para cada dia, la
+        posicion de cada ISIN tras sus operaciones hasta ese dia por su ultimo cierre disponible
+        :param portfolio:
+        :param start_date: Primer dia (por defecto, el de la primera operacion)
+        :param end_date: Ultimo dia (por defecto, hoy)
+        :return: Fechas ISO, valor total por dia y valor por ISIN
+        """
+        actives = [active for active in portfolio if active.operations_list]
+        if not actives:
+            return {"dates": [], "value": [], "by_isin": {}, "missing_prices": []}
+
+        start_ordinal: int = (iso_to_ordinal(start_date) if start_date
+                              else min(active.operations_list[0].date_ordinal for active in actives))
+        end_ordinal: int = iso_to_ordinal(end_date) if end_date else datetime.date.today().toordinal()
+        days: np.ndarray = np.arange(start_ordinal, end_ordinal + 1, dtype=np.int64)
+        total_value: np.ndarray = np.zeros(len(days))
+        by_isin: Dict[str, List[float]] = {}
+        missing_prices: List[str] = []
+
+        for active in actives:
+            prices: np.ndarray = self.prices_on(active.isin, days)
+            if np.isnan(prices).all():
+                missing_prices.append(active.isin)
+                continue
+
+            # -- Posicion tras cada operacion en micro-participaciones exactas. Como en el FIFO, la parte de una venta
+            #    sin compras que la cubran se descarta: x_j = max(x_{j-1} + d_j, 0) = S_j - min(0, min_{k<=j} S_k)
+            n_ops: int = len(active.operations_list)
+            op_dates: np.ndarray = np.fromiter((op.date_ordinal for op in active.operations_list), dtype=np.int64,
+                                               count=n_ops)
+            deltas: np.ndarray = np.fromiter((qty_to_units(op.qty) if isinstance(op, BuyOperation) else -qty_to_units(op.qty)
+                                              for op in active.operations_list), dtype=np.int64, count=n_ops)
+            running: np.ndarray = np.cumsum(deltas)
+            positions: np.ndarray = (running - np.minimum(np.minimum.accumulate(running), 0)) / QTY_SCALE
+
+            # -- Posicion de cada dia: la tras la ultima operacion de ese dia o anterior (busqueda binaria)
+            op_index: np.ndarray = np.searchsorted(op_dates, days, side="right") - 1
+            daily_qty: np.ndarray = np.where(op_index >= 0, positions[np.maximum(op_index, 0)], 0.0)
+
+            value: np.ndarray = np.nan_to_num(daily_qty * prices)
+            total_value += value
+            by_isin[active.isin] = value.tolist()
+
+        return {
+            "dates": [datetime.date.fromordinal(day).isoformat() for day in days.tolist()],
+            "value": total_value.tolist(),
+            "by_isin": by_isin,
+            "missing_prices": missing_prices
+        }
@@ -0,0 +1,173 @@
+import contextlib
+import datetime
+import json
+import os
+import sys
+import time
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, Optional
+
+try:
+    import resource
+except ImportError:  # -- Windows no tiene el modulo resource
+    resource = None
+
+# -- cProfile y tracemalloc solo se importan si se activan, para no cargarlos en cada arranque de la CLI
+if TYPE_CHECKING:
+    import cProfile
+
+
+class PipelineProfiler:
+    """
+    Instrumentacion ligera del pipeline: temporizadores por etapa, contadores y pico de memoria.
+
+    Desactivado no hace nada (las etapas devuelven un contexto nulo), asi que puede quedarse en el codigo sin coste.
+    Activado, genera un perfil JSON legible por maquina y, opcionalmente, un volcado de cProfile.
+    """
+
+    def __init__(self, enabled: bool = False, trace_memory: bool = False, use_cprofile: bool = False):
+        """
+        :param enabled: Activa los temporizadores y contadores
+        :param trace_memory: Ademas mide el pico de memoria de Python con tracemalloc (mas preciso pero mas lento)
+        :param use_cprofile: Ademas perfila la ejecucion completa con cProfile
+        """
+        self.enabled: bool = enabled or trace_memory or use_cprofile
+        self.trace_memory: bool = trace_memory
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.counters: Dict[str, int] = {}
+        self.started_at: float = time.perf_counter()
+        self.cprofile: Optional["cProfile.Profile"] = None
+
+        if self.trace_memory:
+            import tracemalloc
+            tracemalloc.start()
+        if use_cprofile:
+            import cProfile
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+
+    def stage(self, name: str):
+        """
+        Metodo que devuelve un contexto que acumula la duracion de la etapa indicada
+        :param name:
+        :return:
+        """
+        if not self.enabled:
+            return contextlib.nullcontext()
+        return self._timed_stage(name)
+
+    @contextlib.contextmanager
+    def _timed_stage(self, name: str):
+        start: float = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._add_time(name, time.perf_counter() - start)
+
+    def _add_time(self, name: str, elapsed: float, calls: int = 1):
+        stage: Optional[Dict[str, float]] = self.stages.get(name)
+        if stage is None:
+            stage = self.stages[name] = {"seconds": 0.0, "calls": 0}
+        stage["seconds"] += elapsed
+        stage["calls"] += calls
+
+    def timed_iter(self, name: str, iterable: Iterable[Any], counter: Optional[str] = None) -> Iterator[Any]:
+        """
+        Metodo que envuelve un iterable para medir el tiempo empleado en producir sus elementos (p.ej. la lectura
+        del extracto, que se consume fila a fila) y, opcionalmente, contarlos
+        :param name: Etapa a la que se imputa el tiempo
+        :param iterable:
+        :param counter: Contador que se incrementa por cada elemento
+        :return:
+        """
+        if not self.enabled:
+            return iter(iterable)
+        return self._timed_iter(name, iterable, counter)
+
+    def _timed_iter(self, name: str, iterable: Iterable[Any], counter: Optional[str]) -> Iterator[Any]:
+        iterator: Iterator[Any] = iter(iterable)
+        perf_counter = time.perf_counter
+        elapsed: float = 0.0
+        n_items: int = 0
+        try:
+            while True:
+                start: float = perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    elapsed += perf_counter() - start
+                    break
+                elapsed += perf_counter() - start
+                n_items += 1
+                yield item
+        finally:
+            self._add_time(name, elapsed)
+            if counter is not None:
+                self.count(counter, n_items)
+
+    def count(self, name: str, n: int = 1):
+        """
+        Metodo que incrementa un contador
+        :param name:
+        :param n:
+        :return:
+        """
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def peak_memory(self) -> Dict[str, Optional[float]]:
+        """
+        Devuelve el pico de memoria residente del proceso y, si se esta trazando, el pico de memoria de Python (MiB)
+        """
+        peak_rss_mb: Optional[float] = None
+        if resource is not None:
+            max_rss: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            # -- ru_maxrss esta en KiB en Linux y en bytes en macOS
+            peak_rss_mb = max_rss / (1024 * 1024) if sys.platform == "darwin" else max_rss / 1024
+
+        traced_peak_mb: Optional[float] = None
+        if self.trace_memory:
+            import tracemalloc
+            if tracemalloc.is_tracing():
+                traced_peak_mb = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+
+        return {"peak_rss_mb": peak_rss_mb, "tracemalloc_peak_mb": traced_peak_mb}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convierte el perfil a un diccionario serializable
+        """
+        return {
+            "total_seconds": time.perf_counter() - self.started_at,
+            "stages": self.stages,
+            "counters": self.counters,
+            "memory": self.peak_memory()
+        }
+
+    def export(self, output_dir: str) -> Optional[str]:
+        """
+        Metodo que escribe el perfil JSON (y el volcado de cProfile si esta activo) en el directorio de salida
+        :param output_dir:
+        :return: Ruta del perfil JSON o None si el perfilado esta desactivado
+        """
+        if not self.enabled:
+            return None
+
+        os.makedirs(output_dir, exist_ok=True)
+        now_str: str = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+
+        if self.cprofile is not None:
+            self.cprofile.disable()
+            cprofile_path: str = os.path.join(output_dir, f"perfil_{now_str}.prof")
+            self.cprofile.dump_stats(cprofile_path)
+            print(f"Volcado de cProfile exportado correctamente a: {cprofile_path}")
+
+        file_path: str = os.path.join(output_dir, f"perfil_{now_str}.json")
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=4, ensure_ascii=False)
+
+        if self.trace_memory:
+            import tracemalloc
+            tracemalloc.stop()
+
+        print(f"Perfil de ejecucion exportado correctamente a: {file_path}")
+        return file_path
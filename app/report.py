@@ -0,0 +1,143 @@
+import sys
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Literal, Optional, TextIO, Tuple
+
+if TYPE_CHECKING:
+    from app.data_classes import Active
+
+# -- Modos del reporte FIFO:
+#    "console": una llamada a InfoTools por linea (comportamiento original)
+#    "off": no se genera nada
+#    "summary": solo la cabecera y los totales de cada activo
+#    "buffered": reporte completo en texto plano, escrito en stdout de una sola vez
+#    "file": reporte completo en texto plano, escrito en un fichero
+ReportMode = Literal["console", "off", "summary", "buffered", "file"]
+REPORT_MODES: tuple = ("console", "off", "summary", "buffered", "file")
+
+# -- Niveles de linea (coinciden con los metodos <nivel>_print de InfoTools) y su prefijo en texto plano
+LEVEL_PREFIXES = {
+    "header": "\n##### ",
+    "intro": "\n",
+    "sub_intro": "  ",
+    "info": ""
+}
+
+
+def iter_report_lines(active: "Active", full: bool = True) -> Iterator[Tuple[str, str]]:
+    """
+    Genera las lineas del reporte FIFO de un activo como (nivel, texto). Es un generador: cada linea se formatea
+    solo si se consume, asi que en modo resumen no se formatean los tramos casados ni los lotes abiertos
+    :param active:
+    :param full: Si es False solo se generan la cabecera y los totales
+    :return:
+    """
+    yield "header", f"Reporte FIFO para {active.name} ({active.isin})"
+
+    yield "intro", "TOTALES"
+    yield "info", f"Total Gross Profit: {active.total_gross_proffit:.2f}"
+    yield "info", f"Total Net Profit: {active.total_net_proffit:.2f}"
+    yield "info", f"Total Commissions: {active.total_comissions:.2f}"
+    yield "info", f"Total Taxes: {active.total_taxes:.2f}"
+
+    if not full:
+        return
+
+    yield "intro", "OPERACIONES CERRADAS (Lotes Casados):"
+
+    for detail in active.sales_details:
+        sell_op = detail['sell_operation']
+        yield "sub_intro", (f"VENTA: Fecha: {sell_op.str_date},"
+                            f" Qty: {sell_op.qty},"
+                            f" Precio Venta: {sell_op.sell_price:.4f},"
+                            f" Bruto: {detail['gross_profit']:.2f},"
+                            f" Comisiones: {detail['comissions']:.2f},"
+                            f" Impuestos: {detail['taxes']:.2f},"
+                            f" [NETO]: {detail['net_profit']:.2f} €")
+
+        for match in detail['matched_buys']:
+            yield "info", (f"    - COMPRA: Fecha: {match['buy_operation'].str_date},"
+                           f" Qty Casada: {match['matched_qty']:.4f},"
+                           f" Precio Compra: {match['buy_price']:.4f}")
+
+    yield "intro", "Operaciones Abiertas (Cartera Actual):"
+    for op in active.opened_operations_list:
+        yield "info", f"  - Fecha: {op.str_date}, Qty: {op.qty:.4f}, Precio Compra: {op.buy_price:.4f}"
+
+
+def iter_plain_text(lines: Iterable[Tuple[str, str]]) -> Iterator[str]:
+    """
+    Convierte las lineas (nivel, texto) del reporte a texto plano, una cadena por linea
+    """
+    for level, message in lines:
+        yield f"{LEVEL_PREFIXES[level]}{message}\n"
+
+
+class ReportRenderer:
+    """
+    Renderizador del reporte FIFO de los activos.
+
+    Separa la generacion del reporte (iter_report_lines) de su salida, para que las ejecuciones que no lo leen
+    no paguen la E/S de consola: se puede desactivar, reducir a los totales, volcar en texto plano de una sola
+    vez o escribir en un fichero.
+    """
+
+    def __init__(self, mode: ReportMode = "console", file_path: Optional[str] = None):
+        """
+        :param mode: Modo del reporte (ver REPORT_MODES)
+        :param file_path: Fichero de salida del modo "file"
+        """
+        if mode not in REPORT_MODES:
+            raise ValueError(f"Modo de reporte no soportado: {mode}")
+        if mode == "file" and not file_path:
+            raise ValueError("El modo de reporte 'file' necesita file_path")
+
+        self.mode: ReportMode = mode
+        self.file_path: Optional[str] = file_path
+
+    def render(self, actives: Iterable["Active"]):
+        """
+        Metodo que emite el reporte de los activos segun el modo
+        :param actives:
+        :return:
+        """
+        if self.mode == "off":
+            return
+
+        if self.mode == "console":
+            for active in actives:
+                self._print_with_info_tools(active, iter_report_lines(active))
+        elif self.mode == "summary":
+            for active in actives:
+                self._print_with_info_tools(active, iter_report_lines(active, full=False))
+        elif self.mode == "buffered":
+            sys.stdout.write(self.render_text(actives))
+            sys.stdout.flush()
+        else:
+            with open(self.file_path, 'w', encoding='utf-8') as f:
+                self.write_text(f, actives)
+            print(f"Reporte FIFO exportado correctamente a: {self.file_path}")
+
+    @staticmethod
+    def _print_with_info_tools(active: "Active", lines: Iterable[Tuple[str, str]]):
+        """
+        Imprime cada linea con el metodo de InfoTools de su nivel
+        """
+        for level, message in lines:
+            getattr(active.IT, f"{level}_print")(message)
+
+    @staticmethod
+    def render_text(actives: Iterable["Active"]) -> str:
+        """
+        Metodo que devuelve el reporte completo de los activos en texto plano
+        """
+        chunks: List[str] = []
+        for active in actives:
+            chunks.extend(iter_plain_text(iter_report_lines(active)))
+        return "".join(chunks)
+
+    @staticmethod
+    def write_text(f: TextIO, actives: Iterable["Active"]):
+        """
+        Metodo que escribe el reporte completo de los activos en texto plano en un fichero abierto
+        """
+        for active in actives:
+            f.writelines(iter_plain_text(iter_report_lines(active)))
@@ -0,0 +1,124 @@
+import hashlib
+import json
+import os
+import pickle
+import time
+from typing import List, Optional
+
+from app.data_classes import RULES_VERSION, SellOperation
+from app.portfolio import Portfolio
+
+
+class ResultCache:
+    """
+    Cache en disco del portfolio calculado, direccionada por contenido.
+
+    La clave es un hash de los bytes del extracto, de la version de las reglas de comisiones/impuestos y de las
+    restricciones aplicadas, asi que cualquier cambio en el extracto o en las reglas produce una clave nueva. Las
+    entradas huerfanas se eliminan por antigüedad o cuando la cache supera un tamaño maximo (primero las menos
+    usadas recientemente).
+    """
+
+    # -- Version del formato de las entradas (cambiarla invalida todas las entradas existentes)
+    FORMAT_VERSION: int = 1
+
+    def __init__(self, cache_dir: str = "data/cache", max_bytes: int = 512 * 1024 * 1024, max_age_days: float = 30):
+        self.cache_dir: str = cache_dir
+        self.max_bytes: int = max_bytes
+        self.max_age_seconds: float = max_age_days * 24 * 3600
+
+    @staticmethod
+    def rules_fingerprint() -> str:
+        """
+        Metodo que devuelve la huella de las reglas que afectan al resultado (version manual + constantes fiscales)
+        """
+        return json.dumps([
+            RULES_VERSION,
+            SellOperation.TAX_RATE,
+            SellOperation.TAX_ISIN_PREFIX,
+            SellOperation.TAX_START_DATE
+        ])
+
+    def key_for(self, input_path: str, allowed_types: List[str], excluded_initial_isin: List[str]) -> str:
+        """
+        Metodo que calcula la clave de cache de un extracto
+        :param input_path:
+        :param allowed_types:
+        :param excluded_initial_isin:
+        :return:
+        """
+        digest = hashlib.sha256()
+        digest.update(f"{self.FORMAT_VERSION}|{self.rules_fingerprint()}|{allowed_types}|{excluded_initial_isin}|".encode("utf-8"))
+        with open(input_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def load(self, key: str) -> Optional[Portfolio]:
+        """
+        Metodo que devuelve el portfolio guardado para la clave o None si no existe o no se puede leer
+        :param key:
+        :return:
+        """
+        entry_path: str = self._entry_path(key)
+        if not os.path.exists(entry_path):
+            return None
+
+        try:
+            with open(entry_path, 'rb') as f:
+                portfolio: Portfolio = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            # -- Entrada corrupta o de una version incompatible de las clases: se descarta
+            os.remove(entry_path)
+            return None
+
+        # -- Actualizo la fecha de modificacion para que la eviccion sea LRU
+        os.utime(entry_path)
+        return portfolio
+
+    def store(self, key: str, portfolio: Portfolio):
+        """
+        Metodo que guarda el portfolio calculado y aplica la politica de eviccion
+        :param key:
+        :param portfolio:
+        :return:
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        entry_path: str = self._entry_path(key)
+        tmp_path: str = f"{entry_path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(portfolio, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, entry_path)
+
+        self.evict(keep=entry_path)
+
+    def evict(self, keep: Optional[str] = None):
+        """
+        Metodo que elimina las entradas caducadas y, si la cache sigue superando el tamaño maximo, las usadas hace
+        mas tiempo
+        :param keep: Entrada que no se debe eliminar (la recien guardada)
+        :return:
+        """
+        now: float = time.time()
+        entries = []
+        for file_name in os.listdir(self.cache_dir):
+            if not file_name.endswith(".pkl"):
+                continue
+            entry_path: str = os.path.join(self.cache_dir, file_name)
+            stat = os.stat(entry_path)
+            if entry_path != keep and now - stat.st_mtime > self.max_age_seconds:
+                os.remove(entry_path)
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry_path))
+
+        total_bytes: int = sum(size for _, size, _ in entries)
+        for _, size, entry_path in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            if entry_path == keep:
+                continue
+            os.remove(entry_path)
+            total_bytes -= size
@@ -0,0 +1,401 @@
+import asyncio
+import json
+import math
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from app.dates import iso_to_ordinal
+from app.portfolio import Portfolio
+
+# -- Limites de las peticiones HTTP
+MAX_HEADER_LINES: int = 100
+MAX_BODY_BYTES: int = 64 * 1024 * 1024
+IDLE_TIMEOUT_SECONDS: float = 30.0
+
+# -- Numero de latencias recientes que se guardan por endpoint para calcular percentiles
+LATENCY_WINDOW: int = 1024
+
+# -- Campos que necesita Portfolio.ingest en las filas de tipo permitido
+REQUIRED_ROW_FIELDS: tuple = ("date_iso", "type", "description", "isin", "name", "quantity", "incoming_amount",
+                              "outgoing_amount")
+
+HTTP_REASONS: Dict[int, str] = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                                409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class HttpError(Exception):
+    """
+    Error de una peticion que se devuelve al cliente con su codigo HTTP
+    """
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status: int = status
+        self.message: str = message
+
+
+class EndpointMetrics:
+    """
+    Metricas de un endpoint: peticiones, errores, peticiones en curso y latencia (total, maxima y percentiles
+    sobre las ultimas LATENCY_WINDOW peticiones)
+    """
+
+    __slots__ = ("requests", "errors", "in_flight", "total_seconds", "max_seconds", "recent")
+
+    def __init__(self):
+        self.requests: int = 0
+        self.errors: int = 0
+        self.in_flight: int = 0
+        self.total_seconds: float = 0.0
+        self.max_seconds: float = 0.0
+        self.recent: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    def record(self, seconds: float, error: bool):
+        """
+        Metodo que registra una peticion terminada
+        :param seconds: Latencia de la peticion
+        :param error: Si ha terminado con un codigo de error
+        :return:
+        """
+        self.requests += 1
+        self.errors += int(error)
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.recent.append(seconds)
+
+    def to_dict(self) -> Dict[str, Any]:
+        recent: List[float] = sorted(self.recent)
+
+        def percentile(p: float) -> Optional[float]:
+            return round(recent[min(len(recent) - 1, int(p * len(recent)))] * 1000, 3) if recent else None
+
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "mean_ms": round(self.total_seconds / self.requests * 1000, 3) if self.requests else None,
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+            "p99_ms": percentile(0.99),
+            "max_ms": round(self.max_seconds * 1000, 3)
+        }
+
+
+class FifoService:
+    """
+    Servicio HTTP local (asyncio) que mantiene un portfolio cargado en memoria y responde consultas FIFO en JSON.
+
+    El extracto se lee una sola vez al arrancar; despues se pueden agregar filas nuevas (POST /rows) y cada consulta
+    solo calcula el FIFO de las operaciones pendientes de los activos consultados (Active.ensure_fifo), sin releer
+    el extracto ni pagar de nuevo los imports.
+
+    Endpoints:
+        GET  /health                        Estado del servicio
+        GET  /realized?isin=...&year=...    Resultado realizado (Portfolio.realized)
+        GET  /open_lots?isin=...            Lotes de compra abiertos
+        GET  /summary                       Totales del portfolio y resultado por año y mes
+        GET  /metrics                       Metricas por endpoint
+        POST /rows                          Agrega filas de extracto (array JSON o NDJSON)
+
+    Las conexiones se atienden de forma concurrente en el bucle de eventos. El trabajo sobre el portfolio (consultas,
+    que calculan el FIFO bajo demanda, e ingesta) se ejecuta en un hilo para no bloquear el bucle y se serializa con
+    un lock, ya que ambas cosas modifican el estado de los activos.
+    """
+
+    def __init__(self, portfolio: Portfolio, allowed_types: List[str], excluded_initial_isin: List[str],
+                 max_body_bytes: int = MAX_BODY_BYTES):
+        """
+        :param portfolio: Portfolio ya cargado
+        :param allowed_types: Tipos de fila que se procesan al agregar filas
+        :param excluded_initial_isin: Prefijos de ISIN que se descartan al agregar filas
+        :param max_body_bytes: Tamaño maximo del cuerpo de una peticion
+        """
+        self.portfolio: Portfolio = portfolio
+        self.allowed_types: List[str] = allowed_types
+        self.excluded_initial_isin: List[str] = excluded_initial_isin
+        self.max_body_bytes: int = max_body_bytes
+
+        self.lock: asyncio.Lock = asyncio.Lock()
+        self.metrics: Dict[str, EndpointMetrics] = {}
+        self.started_at: float = time.time()
+        self.rows_ingested: int = 0
+
+        # -- Rutas: (metodo, ruta) -> (funcion, si necesita el portfolio)
+        self.routes: Dict[Tuple[str, str], Tuple[Callable[[Dict[str, List[str]], bytes], Any], bool]] = {
+            ("GET", "/health"): (self.health, False),
+            ("GET", "/metrics"): (self.metrics_to_dict, False),
+            ("GET", "/realized"): (self.realized, True),
+            ("GET", "/open_lots"): (self.open_lots, True),
+            ("GET", "/summary"): (self.summary, True),
+            ("POST", "/rows"): (self.append_rows, True),
+        }
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # -- Endpoints
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def health(self, query: Dict[str, List[str]], body: bytes) -> Dict[str, Any]:
+        return {"status": "ok", "uptime_seconds": round(time.time() - self.started_at, 3),
+                "actives": len(self.portfolio)}
+
+    def metrics_to_dict(self, query: Dict[str, List[str]], body: bytes) -> Dict[str, Any]:
+        return {
+            "uptime_seconds": round(time.time() - self.started_at, 3),
+            "rows_ingested": self.rows_ingested,
+            "endpoints": {endpoint: metrics.to_dict() for endpoint, metrics in self.metrics.items()}
+        }
+
+    def realized(self, query: Dict[str, List[str]], body: bytes) -> Dict[str, Any]:
+        year: Optional[str] = _query_param(query, "year")
+        if year is not None and not year.isdigit():
+            raise HttpError(400, f"Año no valido: {year}")
+        return self.portfolio.realized(isin=self._isin(query), year=int(year) if year is not None else None)
+
+    def open_lots(self, query: Dict[str, List[str]], body: bytes) -> List[Dict[str, Any]]:
+        return [op.to_dict() for op in self.portfolio.open_lots(isin=self._isin(query))]
+
+    def summary(self, query: Dict[str, List[str]], body: bytes) -> Dict[str, Any]:
+        totals: Dict[str, Any] = self.portfolio.realized()
+        return {
+            "n_actives": len(self.portfolio),
+            "n_operations": sum(len(active.operations_list) for active in self.portfolio),
+            "open_lots": sum(len(active.opened_operations_list) for active in self.portfolio),
+            "totals": totals,
+            **self.portfolio.period_summary()
+        }
+
+    def append_rows(self, query: Dict[str, List[str]], body: bytes) -> Dict[str, Any]:
+        """
+        Agrega filas nuevas al portfolio. Se validan todas antes de agregar ninguna, y las de cada activo tienen que
+        ser posteriores (o del mismo dia) a su ultima operacion, porque el FIFO se reanuda por el final
+        """
+        rows: List[Dict[str, Any]] = _parse_rows(body)
+        self._validate_rows(rows)
+        n_operations: int = self.portfolio.ingest(rows, self.allowed_types, self.excluded_initial_isin)
+        self.rows_ingested += len(rows)
+        return {"rows": len(rows), "operations": n_operations, "actives": len(self.portfolio)}
+
+    def _isin(self, query: Dict[str, List[str]]) -> Optional[str]:
+        isin: Optional[str] = _query_param(query, "isin")
+        if isin is not None and isin not in self.portfolio:
+            raise HttpError(404, f"ISIN no encontrado: {isin}")
+        return isin
+
+    def _validate_rows(self, rows: List[Dict[str, Any]]):
+        """
+        Comprueba que las filas de tipo permitido tienen los campos necesarios con su tipo (textos, fecha ISO,
+        numeros finitos y cantidad positiva) y estan en orden cronologico, de forma que Portfolio.ingest no pueda
+        fallar a mitad y dejar el portfolio con parte de las filas
+        """
+        last_dates: Dict[str, str] = {}
+        for idx, row in enumerate(rows):
+            if not isinstance(row, dict):
+                raise HttpError(400, f"La fila {idx} no es un objeto JSON")
+            if row.get("type") not in self.allowed_types:
+                continue
+            missing: List[str] = [field for field in REQUIRED_ROW_FIELDS if row.get(field) is None]
+            if missing:
+                raise HttpError(400, f"A la fila {idx} le faltan campos: {', '.join(missing)}")
+
+            # -- Portfolio.ingest no valida nada: cualquier valor de tipo incorrecto fallaria a mitad de la ingesta,
+            #    con las filas anteriores ya agregadas
+            text_fields: List[str] = [field for field in ("date_iso", "description", "isin", "name")
+                                      if not isinstance(row[field], str)]
+            if text_fields:
+                raise HttpError(400, f"La fila {idx} tiene campos que no son texto: {', '.join(text_fields)}")
+            try:
+                iso_to_ordinal(row["date_iso"])
+            except ValueError:
+                raise HttpError(400, f"La fila {idx} tiene una fecha no valida: {row['date_iso']}")
+            number_fields: List[str] = [field for field in ("quantity", "incoming_amount", "outgoing_amount")
+                                        if not _is_number(row[field])]
+            if number_fields:
+                raise HttpError(400, f"La fila {idx} tiene campos que no son numeros: {', '.join(number_fields)}")
+            if row["quantity"] <= 0:
+                raise HttpError(400, f"La fila {idx} tiene una cantidad no positiva: {row['quantity']}")
+
+            isin: str = row["isin"]
+            if isin not in last_dates:
+                active = self.portfolio.get(isin)
+                last_dates[isin] = active.operations_list[-1].str_date if active and active.operations_list else ""
+            if row["date_iso"] < last_dates[isin]:
+                raise HttpError(409, f"La fila {idx} ({isin}, {row['date_iso']}) es anterior a la ultima operacion "
+                                     f"del activo ({last_dates[isin]})")
+            last_dates[isin] = row["date_iso"]
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # -- HTTP
+    # ------------------------------------------------------------------------------------------------------------------
+
+    async def start(self, host: str = "127.0.0.1", port: int = 9001) -> asyncio.AbstractServer:
+        """
+        Metodo que arranca el servidor (sin bloquear)
+        :param host:
+        :param port:
+        :return:
+        """
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Atiende una conexion; con keep-alive se procesan varias peticiones seguidas sobre la misma conexion
+        """
+        try:
+            keep_alive: bool = True
+            while keep_alive:
+                try:
+                    request = await asyncio.wait_for(self._read_request(reader), IDLE_TIMEOUT_SECONDS)
+                except HttpError as e:
+                    await self._write_response(writer, e.status, {"error": e.message}, keep_alive=False)
+                    return
+                if request is None:
+                    return
+
+                method, target, keep_alive, body = request
+                status, payload = await self.dispatch(method, target, body)
+                await self._write_response(writer, status, payload, keep_alive)
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method: str, target: str, body: bytes) -> Tuple[int, Any]:
+        """
+        Resuelve la ruta de una peticion, la ejecuta y registra su latencia en las metricas del endpoint
+        :param method:
+        :param target: Ruta con la query string
+        :param body:
+        :return: Codigo HTTP y respuesta (serializable a JSON)
+        """
+        url = urlsplit(target)
+        route = self.routes.get((method, url.path))
+        if route is None:
+            allowed: bool = any(path == url.path for _, path in self.routes)
+            return (405, {"error": f"Metodo no permitido: {method}"}) if allowed else (404, {"error": "Ruta no encontrada"})
+
+        handler, uses_portfolio = route
+        metrics: EndpointMetrics = self.metrics.setdefault(f"{method} {url.path}", EndpointMetrics())
+        metrics.in_flight += 1
+        started: float = time.perf_counter()
+        status: int = 200
+        try:
+            query: Dict[str, List[str]] = parse_qs(url.query)
+            if uses_portfolio:
+                async with self.lock:
+                    payload: Any = await asyncio.get_running_loop().run_in_executor(None, handler, query, body)
+            else:
+                payload = handler(query, body)
+        except HttpError as e:
+            status, payload = e.status, {"error": e.message}
+        except Exception as e:
+            status, payload = 500, {"error": repr(e)}
+        finally:
+            metrics.in_flight -= 1
+            metrics.record(time.perf_counter() - started, error=status >= 400)
+        return status, payload
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[Tuple[str, str, bool, bytes]]:
+        """
+        Lee una peticion HTTP/1.x. Devuelve None si el cliente ha cerrado la conexion
+        :return: Metodo, ruta, si se mantiene la conexion y cuerpo
+        """
+        request_line: bytes = await reader.readline()
+        if not request_line.strip():
+            return None
+        try:
+            method, target, version = request_line.decode("latin-1").split()
+        except ValueError:
+            raise HttpError(400, "Linea de peticion no valida")
+
+        headers: Dict[str, str] = {}
+        for _ in range(MAX_HEADER_LINES):
+            line: bytes = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        else:
+            raise HttpError(400, "Demasiadas cabeceras")
+
+        try:
+            content_length: int = int(headers.get("content-length", "0"))
+        except ValueError:
+            raise HttpError(400, "Content-Length no valido")
+        if content_length > self.max_body_bytes:
+            raise HttpError(413, f"El cuerpo supera {self.max_body_bytes} bytes")
+        body: bytes = await reader.readexactly(content_length) if content_length > 0 else b""
+
+        connection: str = headers.get("connection", "").lower()
+        keep_alive: bool = connection == "keep-alive" if version == "HTTP/1.0" else connection != "close"
+        return method.upper(), target, keep_alive, body
+
+    @staticmethod
+    async def _write_response(writer: asyncio.StreamWriter, status: int, payload: Any, keep_alive: bool):
+        content: bytes = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        head: str = (f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+                     f"Content-Type: application/json; charset=utf-8\r\n"
+                     f"Content-Length: {len(content)}\r\n"
+                     f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + content)
+        await writer.drain()
+
+
+def _is_number(value: Any) -> bool:
+    """
+    Indica si un valor JSON es un numero finito (bool es subclase de int, asi que se excluye)
+    """
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def _query_param(query: Dict[str, List[str]], name: str) -> Optional[str]:
+    values: Optional[List[str]] = query.get(name)
+    return values[-1] if values else None
+
+
+def _parse_rows(body: bytes) -> List[Dict[str, Any]]:
+    """
+    Decodifica las filas del cuerpo de POST /rows: un array JSON, un unico objeto o NDJSON
+    """
+    try:
+        text: str = body.decode("utf-8").strip()
+    except UnicodeDecodeError as e:
+        raise HttpError(400, f"El cuerpo no es UTF-8 valido: {e}")
+    if not text:
+        raise HttpError(400, "El cuerpo esta vacio")
+    try:
+        if text[0] == "[":
+            return json.loads(text)
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+    except json.JSONDecodeError as e:
+        raise HttpError(400, f"JSON no valido: {e}")
+
+
+def serve(portfolio: Portfolio, allowed_types: List[str], excluded_initial_isin: List[str],
+          host: str = "127.0.0.1", port: int = 9001, warm: bool = True):
+    """
+    Arranca el servicio y lo mantiene en marcha hasta que se interrumpe (Ctrl+C)
+    :param portfolio: Portfolio ya cargado
+    :param allowed_types:
+    :param excluded_initial_isin:
+    :param host:
+    :param port:
+    :param warm: Si es True se calcula el FIFO de todos los activos antes de aceptar peticiones
+    :return:
+    """
+    async def run():
+        service: FifoService = FifoService(portfolio, allowed_types, excluded_initial_isin)
+        server: asyncio.AbstractServer = await service.start(host, port)
+        print(f"Servicio FIFO escuchando en http://{host}:{port} ({len(portfolio)} activos)")
+        async with server:
+            await server.serve_forever()
+
+    if warm:
+        for active in portfolio:
+            active.ensure_fifo()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        print("Servicio FIFO detenido")
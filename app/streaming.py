@@ -0,0 +1,149 @@
+import json
+from typing import Any, Dict, Iterator, TextIO
+
+# -- Tamaño de los bloques que se leen del fichero
+CHUNK_SIZE: int = 1 << 16
+
+# -- Extensiones que se tratan como NDJSON (un objeto JSON por linea)
+NDJSON_EXTENSIONS: tuple = (".ndjson", ".jsonl")
+
+# -- Extensiones que se leen como extracto de cuenta en PDF (ver app.pdf_parser)
+PDF_EXTENSIONS: tuple = (".pdf",)
+
+_WHITESPACE: str = " \t\n\r"
+
+
+class _ChunkedBuffer:
+    """
+    Buffer de texto que se va rellenando por bloques desde un fichero y descarta lo ya consumido
+    """
+
+    def __init__(self, f: TextIO, chunk_size: int):
+        self.f: TextIO = f
+        self.chunk_size: int = chunk_size
+        self.buffer: str = ""
+        self.pos: int = 0
+        self.eof: bool = False
+
+    def fill(self) -> bool:
+        """
+        Metodo que lee el siguiente bloque. Devuelve False si el fichero ya se ha terminado
+        """
+        if self.eof:
+            return False
+        chunk: str = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """
+        Metodo que salta los espacios y devuelve el siguiente caracter significativo ("" si se acaba el fichero)
+        """
+        while True:
+            buffer: str = self.buffer
+            pos: int = self.pos
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            self.pos = pos
+            if pos < len(buffer):
+                return buffer[pos]
+            if not self.fill():
+                return ""
+
+
+def iter_json_array(f: TextIO, chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    """
+    Generador que recorre los elementos de un array JSON leyendo el fichero por bloques, sin cargar el documento
+    entero en memoria
+    :param f: Fichero de texto abierto cuyo contenido es un array JSON
+    :param chunk_size:
+    :return:
+    """
+    decoder: json.JSONDecoder = json.JSONDecoder()
+    reader: _ChunkedBuffer = _ChunkedBuffer(f, chunk_size)
+
+    # -- 1: El documento tiene que empezar por "["
+    if reader.peek() != "[":
+        raise ValueError("El extracto no es un array JSON")
+    reader.pos += 1
+
+    if reader.peek() == "]":
+        return
+
+    while True:
+
+        # -- 2: Decodifico el siguiente elemento; si esta cortado al final del buffer, leo otro bloque y reintento
+        reader.peek()
+        while True:
+            try:
+                value, end = decoder.raw_decode(reader.buffer, reader.pos)
+            except json.JSONDecodeError:
+                if not reader.fill():
+                    raise
+                continue
+
+            # ---- 2.1: Si tras el valor no viene ya un separador, el valor (p.ej. un numero) podria estar cortado
+            buffer: str = reader.buffer
+            next_pos: int = end
+            while next_pos < len(buffer) and buffer[next_pos] in _WHITESPACE:
+                next_pos += 1
+            if (next_pos == len(buffer) or buffer[next_pos] not in ",]") and reader.fill():
+                continue
+            break
+
+        reader.pos = end
+        yield value
+
+        # -- 3: Separador o cierre del array
+        separator: str = reader.peek()
+        if separator == ",":
+            reader.pos += 1
+        elif separator == "]":
+            return
+        else:
+            raise ValueError(f"Caracter inesperado en el array JSON: {separator!r}")
+
+
+def iter_ndjson(f: TextIO) -> Iterator[Any]:
+    """
+    Generador que recorre un fichero NDJSON (un objeto JSON por linea, ignorando lineas vacias)
+    :param f:
+    :return:
+    """
+    for line in f:
+        if line.strip():
+            yield json.loads(line)
+
+
+def iter_extract_rows(file_path: str, pdf_workers: int = 1) -> Iterator[Dict[str, Any]]:
+    """
+    Generador que devuelve las filas de un extracto una a una. Acepta un array JSON (formato exportado por la web)
+    o NDJSON, que se detecta por la extension o por el primer caracter del fichero, y el extracto original en PDF
+    :param file_path:
+    :param pdf_workers: Numero de procesos para extraer las paginas de un PDF
+    :return:
+    """
+    if file_path.lower().endswith(PDF_EXTENSIONS):
+        from app.pdf_parser import iter_pdf_rows
+        yield from iter_pdf_rows(file_path, workers=pdf_workers)
+        return
+
+    with open(file_path, 'r', encoding='utf-8') as f:
+        if file_path.lower().endswith(NDJSON_EXTENSIONS):
+            yield from iter_ndjson(f)
+            return
+
+        # -- Un array JSON empieza por "["; si empieza por "{" es NDJSON aunque la extension sea .json
+        first_char: str = f.read(1)
+        while first_char and first_char in _WHITESPACE:
+            first_char = f.read(1)
+        f.seek(0)
+
+        if first_char == "{":
+            yield from iter_ndjson(f)
+        else:
+            yield from iter_json_array(f)
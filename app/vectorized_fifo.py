@@ -0,0 +1,315 @@
+from typing import Any, Dict, Iterable, List
+
+import numpy as np
+import pandas as pd
+
+from app.data_classes import SellOperation
+from app.money import QTY_SCALE
+from app.portfolio import Portfolio
+
+
+class VectorizedFifoResult:
+    """
+    Resultado del motor FIFO vectorizado, en forma de tablas:
+
+    - sales: una fila por venta (isin, posicion de la operacion en el activo, impuestos, bruto, beneficios...)
+    - legs: una fila por tramo casado (venta, compra, cantidad casada y precio de compra)
+    - open_lots: una fila por lote de compra que sigue abierto
+    - totals: totales por ISIN
+    """
+
+    def __init__(self, sales: pd.DataFrame, legs: pd.DataFrame, open_lots: pd.DataFrame, totals: pd.DataFrame):
+        self.sales: pd.DataFrame = sales
+        self.legs: pd.DataFrame = legs
+        self.open_lots: pd.DataFrame = open_lots
+        self.totals: pd.DataFrame = totals
+
+    def to_fifo_states(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Convierte el resultado a estados FIFO por ISIN con el formato de Active.fifo_state_to_dict
+        :return:
+        """
+        states: Dict[str, Dict[str, Any]] = {}
+        for row in self.totals.itertuples(index=False):
+            states[row.isin] = {
+                "processed_count": int(row.processed_count),
+                "total_gross_proffit": float(row.total_gross_proffit),
+                "total_comissions": float(row.total_comissions),
+                "total_taxes": float(row.total_taxes),
+                "open_lots": [],
+                "sales": []
+            }
+
+        for isin, op_pos, remaining_qty in zip(self.open_lots["isin"], self.open_lots["op_pos"].tolist(),
+                                               self.open_lots["remaining_qty"].tolist()):
+            states[isin]["open_lots"].append([op_pos, remaining_qty])
+
+        # -- Los tramos estan ordenados por venta, asi que los reparto recorriendo ambas tablas una sola vez
+        leg_sale_ids: List[int] = self.legs["sale_id"].tolist()
+        leg_rows = list(zip(self.legs["buy_op_pos"].tolist(), self.legs["matched_qty"].tolist(),
+                            self.legs["buy_price"].tolist()))
+        leg_idx: int = 0
+        n_legs: int = len(leg_rows)
+
+        for sale_id, (isin, op_pos, taxes, bruto, sell_price, gross_profit, net_profit) in enumerate(zip(
+                self.sales["isin"], self.sales["op_pos"].tolist(), self.sales["taxes"].tolist(),
+                self.sales["bruto"].tolist(), self.sales["sell_price"].tolist(),
+                self.sales["gross_profit"].tolist(), self.sales["net_profit"].tolist())):
+            matched_buys: List[list] = []
+            while leg_idx < n_legs and leg_sale_ids[leg_idx] == sale_id:
+                buy_op_pos, matched_qty, buy_price = leg_rows[leg_idx]
+                matched_buys.append([buy_op_pos, matched_qty, buy_price])
+                leg_idx += 1
+            states[isin]["sales"].append([op_pos, taxes, bruto, sell_price, gross_profit, net_profit, matched_buys])
+
+        return states
+
+    def apply_to_portfolio(self, portfolio: Portfolio):
+        """
+        Vuelca el resultado en los Active del portfolio (construido a partir del mismo extracto) para que los
+        reportes y exportaciones existentes funcionen igual que con el motor de objetos
+        :param portfolio:
+        :return:
+        """
+        for isin, state in self.to_fifo_states().items():
+            active = portfolio.get(isin)
+            active.load_fifo_state(state)
+            active.calculate_fifo_incremental()
+
+
+class VectorizedFifoEngine:
+    """
+    Motor FIFO alternativo que trabaja sobre un DataFrame con todo el extracto.
+
+    Clasifica compras/ventas, comisiones y precios columna a columna y casa las ventas contra las compras de cada
+    ISIN por interseccion de intervalos de cantidad acumulada (searchsorted sobre las sumas acumuladas), sin bucles
+    por fila. Reproduce la semantica de Active.calculate_fifo: una venta solo casa contra compras anteriores y la
+    parte que no se puede cubrir se descarta. Como el motor de objetos, trabaja con cantidades enteras en
+    micro-participaciones, asi que las sumas acumuladas son exactas y los tramos y lotes abiertos coinciden.
+    """
+
+    COLUMNS: List[str] = ["date_iso", "type", "description", "isin", "name", "quantity", "incoming_amount",
+                          "outgoing_amount"]
+
+    def __init__(self, allowed_types: List[str], excluded_initial_isin: List[str]):
+        self.allowed_types: List[str] = allowed_types
+        self.excluded_initial_isin: List[str] = excluded_initial_isin
+
+    def load(self, rows: Iterable[Dict[str, Any]]) -> pd.DataFrame:
+        """
+        Metodo que carga las filas del extracto en un DataFrame, aplica las restricciones y calcula las columnas
+        derivadas de cada operacion
+        :param rows:
+        :return:
+        """
+        df: pd.DataFrame = pd.DataFrame.from_records(list(rows), columns=self.COLUMNS)
+
+        # -- 1: Aplico restricciones
+        mask = df["type"].isin(self.allowed_types)
+        if self.excluded_initial_isin:
+            mask &= ~df["isin"].str.startswith(tuple(self.excluded_initial_isin))
+        df = df[mask].reset_index(drop=True)
+
+        # -- 2: Importe y posicion de la operacion dentro de su activo
+        df["amount"] = np.where(df["outgoing_amount"] > 0, df["outgoing_amount"], df["incoming_amount"])
+        df["op_pos"] = df.groupby("isin", sort=False).cumcount()
+        return self._derive_columns(df)
+
+    def load_portfolio(self, portfolio: Portfolio) -> pd.DataFrame:
+        """
+        Metodo que construye el mismo DataFrame que load a partir de las operaciones ya agregadas a un portfolio
+        (con las restricciones ya aplicadas), para no volver a leer el extracto
+        :param portfolio:
+        :return:
+        """
+        operations = [op for active in portfolio for op in active.operations_list]
+        df: pd.DataFrame = pd.DataFrame({
+            # -- dtype explicito: con un portfolio vacio las listas vacias saldrian como float64 y .str fallaria
+            "date_iso": pd.Series([op.str_date for op in operations], dtype=object),
+            "isin": pd.Series([op.isin for op in operations], dtype=object),
+            "name": pd.Series([active.name for active in portfolio for _ in active.operations_list], dtype=object),
+            "description": pd.Series([op.description for op in operations], dtype=object),
+            "quantity": np.fromiter((op.qty for op in operations), dtype=float, count=len(operations)),
+            "amount": np.fromiter((op.amount for op in operations), dtype=float, count=len(operations)),
+            "op_pos": np.fromiter((pos for active in portfolio for pos in range(len(active.operations_list))),
+                                  dtype=np.int64, count=len(operations))
+        })
+        return self._derive_columns(df)
+
+    @staticmethod
+    def _derive_columns(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Calcula el tipo de operacion, las comisiones y el precio de compra de cada fila
+        """
+        df["is_sell"] = df["description"].str.startswith("Sell")
+
+        # -- Comisiones (ventas 1 €, planes de ahorro 0 €, resto de compras 1 €) y precio de compra
+        is_savings = df["description"].str.contains("Savings", regex=False)
+        df["comissions"] = np.where(df["is_sell"], 1.0, np.where(is_savings, 0.0, 1.0))
+        df["buy_price"] = np.where(df["is_sell"], np.nan, (df["amount"] - df["comissions"]) / df["quantity"])
+        return df
+
+    def run(self, df: pd.DataFrame) -> VectorizedFifoResult:
+        """
+        Metodo que realiza el casado FIFO de todas las ventas de todos los ISIN a la vez
+        :param df: DataFrame devuelto por load o load_portfolio
+        :return:
+        """
+        # ----------------------------------------------------------------------------------------------------------
+        # -- 1: Ordeno por activo (orden de aparicion) manteniendo el orden del extracto dentro de cada activo
+        # ----------------------------------------------------------------------------------------------------------
+        df = df.assign(group=pd.factorize(df["isin"])[0])
+        df = df.sort_values(["group", "op_pos"], kind="stable").reset_index(drop=True)
+        group: np.ndarray = df["group"].to_numpy()
+        is_sell: np.ndarray = df["is_sell"].to_numpy()
+        qty: np.ndarray = df["quantity"].to_numpy(dtype=float)
+        qty_units: np.ndarray = np.rint(qty * QTY_SCALE).astype(np.int64)
+        n_groups: int = int(group.max()) + 1 if len(df) else 0
+
+        # ----------------------------------------------------------------------------------------------------------
+        # -- 2: Cantidades acumuladas por activo (micro-participaciones)
+        # ----------------------------------------------------------------------------------------------------------
+        buy_qty: np.ndarray = np.where(is_sell, 0, qty_units)
+        sell_qty: np.ndarray = np.where(is_sell, qty_units, 0)
+        grouped = pd.DataFrame({"group": group, "buy_qty": buy_qty, "sell_qty": sell_qty}).groupby("group", sort=False)
+
+        # ---- 2.1: Compras acumuladas hasta cada fila y ventas pedidas acumuladas
+        bought_before: np.ndarray = grouped["buy_qty"].cumsum().to_numpy()
+        requested: np.ndarray = grouped["sell_qty"].cumsum().to_numpy()
+
+        # ---- 2.2: Ventas efectivamente casadas: x_j = min(x_{j-1} + q_j, compras hasta j). La recurrencia se
+        #           resuelve con un minimo acumulado: x_j = Q_j + min(0, min_{k<=j}(B_k - Q_k))
+        sell_rows: np.ndarray = np.flatnonzero(is_sell)
+        slack = pd.Series(bought_before[sell_rows] - requested[sell_rows]).groupby(group[sell_rows], sort=False).cummin()
+        sold_end: np.ndarray = requested[sell_rows] + np.minimum(slack.to_numpy(), 0)
+        sold_start: np.ndarray = pd.Series(sold_end).groupby(group[sell_rows], sort=False).shift(1, fill_value=0).to_numpy()
+
+        # ---- 2.3: Paso a coordenadas globales desplazando cada activo por las compras de los activos anteriores
+        group_buy_total: np.ndarray = np.zeros(n_groups, dtype=np.int64)
+        np.add.at(group_buy_total, group, buy_qty)
+        group_offset: np.ndarray = np.concatenate(([0], np.cumsum(group_buy_total)[:-1])) if n_groups else group_buy_total
+        buy_rows: np.ndarray = np.flatnonzero(~is_sell)
+        buy_end: np.ndarray = np.cumsum(buy_qty[buy_rows])
+        buy_start: np.ndarray = buy_end - buy_qty[buy_rows]
+        sell_offset: np.ndarray = group_offset[group[sell_rows]]
+        global_start: np.ndarray = sold_start + sell_offset
+        global_end: np.ndarray = sold_end + sell_offset
+
+        # ----------------------------------------------------------------------------------------------------------
+        # -- 3: Interseccion de intervalos [inicio, fin) de cada venta con los de las compras
+        # ----------------------------------------------------------------------------------------------------------
+        first_buy: np.ndarray = np.searchsorted(buy_end, global_start, side="right")
+        last_buy: np.ndarray = np.searchsorted(buy_start, global_end, side="left") - 1
+        n_legs: np.ndarray = np.where(global_end > global_start, np.maximum(last_buy - first_buy + 1, 0), 0)
+
+        leg_sale: np.ndarray = np.repeat(np.arange(len(sell_rows)), n_legs)
+        leg_rank: np.ndarray = np.arange(len(leg_sale)) - np.repeat(np.cumsum(n_legs) - n_legs, n_legs)
+        leg_buy: np.ndarray = first_buy[leg_sale] + leg_rank
+        leg_qty: np.ndarray = (np.minimum(buy_end[leg_buy], global_end[leg_sale])
+                               - np.maximum(buy_start[leg_buy], global_start[leg_sale]))
+
+        # ---- 3.1: Descarto los tramos vacios
+        keep: np.ndarray = leg_qty > 0
+        leg_sale, leg_buy, leg_qty = leg_sale[keep], leg_buy[keep], leg_qty[keep]
+
+        # ----------------------------------------------------------------------------------------------------------
+        # -- 4: Coste de compra, retencion, bruto y beneficios por venta
+        # ----------------------------------------------------------------------------------------------------------
+        # ---- 4.1: Coste por micro-participacion de cada compra (mismo reparto que LotQueue) y coste de cada venta
+        buy_price_all: np.ndarray = df["buy_price"].to_numpy(dtype=float)
+        leg_buy_price: np.ndarray = buy_price_all[buy_rows][leg_buy]
+        unit_cost: np.ndarray = ((df["amount"].to_numpy(dtype=float) - df["comissions"].to_numpy(dtype=float))[buy_rows]
+                                 / qty_units[buy_rows])
+        total_buy_cost: np.ndarray = np.bincount(leg_sale, weights=leg_qty * unit_cost[leg_buy], minlength=len(sell_rows))
+        matched_units: np.ndarray = np.bincount(leg_sale, weights=leg_qty, minlength=len(sell_rows))
+
+        sells: pd.DataFrame = df.iloc[sell_rows]
+        amount: np.ndarray = sells["amount"].to_numpy(dtype=float)
+        sell_comissions: np.ndarray = sells["comissions"].to_numpy(dtype=float)
+        sell_qty_arr: np.ndarray = qty[sell_rows]
+        tax_rate: float = SellOperation.TAX_RATE
+
+        applies_tax: np.ndarray = (sells["isin"].str.startswith(SellOperation.TAX_ISIN_PREFIX).to_numpy()
+                                   & (sells["date_iso"].to_numpy() >= SellOperation.TAX_START_DATE))
+        v_hypothetical: np.ndarray = (amount + sell_comissions - tax_rate * total_buy_cost) / (1 - tax_rate)
+        withheld: np.ndarray = applies_tax & (v_hypothetical > total_buy_cost)
+        bruto: np.ndarray = np.where(withheld, v_hypothetical, amount + sell_comissions)
+        taxes: np.ndarray = np.where(withheld, (v_hypothetical - total_buy_cost) * tax_rate, 0.0)
+        sell_price: np.ndarray = bruto / sell_qty_arr
+
+        # ---- 4.2: Beneficio bruto = parte del bruto correspondiente a la cantidad casada - coste de compra
+        sell_units: np.ndarray = qty_units[sell_rows]
+        fully_matched: np.ndarray = matched_units == sell_units
+        matched_bruto: np.ndarray = np.where(fully_matched, bruto, bruto * matched_units / np.where(fully_matched, 1, sell_units))
+        gross_profit: np.ndarray = matched_bruto - total_buy_cost
+        net_profit: np.ndarray = gross_profit - sell_comissions - taxes
+
+        sales: pd.DataFrame = pd.DataFrame({
+            "isin": sells["isin"].to_numpy(),
+            "name": sells["name"].to_numpy(),
+            "op_pos": sells["op_pos"].to_numpy(),
+            "date_iso": sells["date_iso"].to_numpy(),
+            "qty": sell_qty_arr,
+            "amount": amount,
+            "comissions": sell_comissions,
+            "taxes": taxes,
+            "bruto": bruto,
+            "sell_price": sell_price,
+            "total_buy_cost": total_buy_cost,
+            "gross_profit": gross_profit,
+            "net_profit": net_profit
+        })
+
+        buys: pd.DataFrame = df.iloc[buy_rows]
+        legs: pd.DataFrame = pd.DataFrame({
+            "sale_id": leg_sale,
+            "isin": sales["isin"].to_numpy()[leg_sale],
+            "sell_op_pos": sales["op_pos"].to_numpy()[leg_sale],
+            "buy_op_pos": buys["op_pos"].to_numpy()[leg_buy],
+            "buy_date_iso": buys["date_iso"].to_numpy()[leg_buy],
+            "matched_qty": leg_qty / QTY_SCALE,
+            "buy_price": leg_buy_price
+        })
+
+        # ----------------------------------------------------------------------------------------------------------
+        # -- 5: Lotes abiertos: lo que queda de cada compra por encima de lo vendido en su activo
+        # ----------------------------------------------------------------------------------------------------------
+        sold_total: np.ndarray = group_offset.copy()
+        if len(sell_rows):
+            sell_group: np.ndarray = group[sell_rows]
+            last_sell: np.ndarray = np.append(sell_group[1:] != sell_group[:-1], True)
+            sold_total[sell_group[last_sell]] = global_end[last_sell]
+        buy_group: np.ndarray = group[buy_rows]
+        consumed_until: np.ndarray = sold_total[buy_group]
+        remaining_qty: np.ndarray = buy_end - np.maximum(buy_start, consumed_until)
+
+        # ---- 5.1: Un lote se retira cuando no le queda nada (las cantidades son exactas)
+        is_open: np.ndarray = remaining_qty > 0
+        open_lots: pd.DataFrame = pd.DataFrame({
+            "isin": buys["isin"].to_numpy()[is_open],
+            "name": buys["name"].to_numpy()[is_open],
+            "op_pos": buys["op_pos"].to_numpy()[is_open],
+            "date_iso": buys["date_iso"].to_numpy()[is_open],
+            "remaining_qty": remaining_qty[is_open] / QTY_SCALE,
+            "buy_price": buy_price_all[buy_rows][is_open]
+        })
+
+        # ----------------------------------------------------------------------------------------------------------
+        # -- 6: Totales por activo
+        # ----------------------------------------------------------------------------------------------------------
+        comissions_by_group: np.ndarray = np.bincount(group, weights=df["comissions"].to_numpy(dtype=float),
+                                                      minlength=n_groups)
+        taxes_by_group: np.ndarray = np.bincount(group[sell_rows], weights=taxes, minlength=n_groups)
+        gross_by_group: np.ndarray = np.bincount(group[sell_rows], weights=gross_profit, minlength=n_groups)
+        first_rows: pd.DataFrame = df.drop_duplicates("group")
+        totals: pd.DataFrame = pd.DataFrame({
+            "isin": first_rows["isin"].to_numpy(),
+            "name": first_rows["name"].to_numpy(),
+            "processed_count": np.bincount(group, minlength=n_groups),
+            "total_gross_proffit": gross_by_group,
+            "total_comissions": comissions_by_group,
+            "total_taxes": taxes_by_group,
+            "total_net_proffit": gross_by_group - comissions_by_group - taxes_by_group
+        })
+
+        return VectorizedFifoResult(sales=sales, legs=legs, open_lots=open_lots, totals=totals)
@@ -0,0 +1,88 @@
+"""
+Micro-benchmark de la cola FIFO de lotes.
+
+Compara el casado de ventas contra la lista de diccionarios con pop(0) (y cantidades float con epsilon de
+agotamiento) que usaba Active.calculate_fifo y la LotQueue actual (enteros de micro-participaciones y coste por
+tramo), para un unico ISIN con N compras de plan de ahorro seguidas de N ventas parciales.
+
+Uso (desde la raiz del proyecto):
+    python -m benchmarks.bench_lot_queue [N]
+"""
+import random
+import sys
+import time
+from typing import List, Tuple
+
+from app.lot_queue import LotQueue
+from app.money import money_to_units, qty_to_units
+
+# -- Cantidad por debajo de la cual la implementacion anterior daba un lote por agotado
+LOT_EXHAUSTED_EPSILON: float = 0.000001
+
+
+def build_synthetic_lots(n: int, seed: int = 42) -> Tuple[List[Tuple[object, float]], List[float]]:
+    """
+    Genera n compras y n ventas; cada venta consume aproximadamente una compra para que la cola se mantenga larga
+    :param n:
+    :param seed:
+    :return: (compras [(op, qty)], cantidades vendidas)
+    """
+    rng: random.Random = random.Random(seed)
+    buys: List[Tuple[object, float]] = [(object(), round(rng.uniform(0.05, 2.0), 6)) for _ in range(n)]
+    total_qty: float = sum(qty for _, qty in buys)
+    sells: List[float] = [round(total_qty / n, 6)] * n
+    return buys, sells
+
+
+def match_with_list(buys: List[Tuple[object, float]], sells: List[float]) -> int:
+    """
+    Casado con la implementacion anterior: lista de diccionarios y pop(0)
+    """
+    fifo_queue = [{'op': op, 'remaining_qty': qty} for op, qty in buys]
+    legs: int = 0
+    for qty_to_sell in sells:
+        while qty_to_sell > 0 and fifo_queue:
+            buy_entry = fifo_queue[0]
+            matched_qty = min(qty_to_sell, buy_entry['remaining_qty'])
+            qty_to_sell -= matched_qty
+            buy_entry['remaining_qty'] -= matched_qty
+            legs += 1
+            if buy_entry['remaining_qty'] <= LOT_EXHAUSTED_EPSILON:
+                fifo_queue.pop(0)
+    return legs
+
+
+def match_with_lot_queue(buys: List[Tuple[object, float]], sells: List[float]) -> int:
+    """
+    Casado con LotQueue
+    """
+    fifo_queue: LotQueue = LotQueue()
+    for op, qty in buys:
+        fifo_queue.append(op, qty_to_units(qty), money_to_units(qty * 100))
+    legs: int = 0
+    for qty in sells:
+        qty_to_sell: int = qty_to_units(qty)
+        while qty_to_sell > 0 and fifo_queue:
+            matched_qty, _ = fifo_queue.consume_front(qty_to_sell)
+            qty_to_sell -= matched_qty
+            legs += 1
+    return legs
+
+
+def main(n: int = 100_000):
+    buys, sells = build_synthetic_lots(n)
+
+    results = {}
+    for label, func in (("list.pop(0)", match_with_list), ("LotQueue", match_with_lot_queue)):
+        start: float = time.perf_counter()
+        legs: int = func(buys, sells)
+        elapsed: float = time.perf_counter() - start
+        results[label] = (elapsed, legs)
+        print(f"{label:<12} {elapsed:8.3f} s  ({legs} tramos casados)")
+
+    assert results["list.pop(0)"][1] == results["LotQueue"][1], "Ambas implementaciones deben casar los mismos tramos"
+    print(f"Speedup: x{results['list.pop(0)'][0] / results['LotQueue'][0]:.1f} con {n} compras y {n} ventas")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,97 @@
+"""
+Benchmark de memoria (tracemalloc) del modelo de operaciones.
+
+Construye N operaciones sinteticas con el modelo anterior (una instancia con __dict__, un datetime de strptime y
+textos sin internar por fila) y con las clases actuales con __slots__, y compara la memoria retenida.
+
+Uso (desde la raiz del proyecto):
+    python -m benchmarks.bench_operation_memory [N]
+"""
+import datetime
+import gc
+import random
+import sys
+import time
+import tracemalloc
+from typing import List, Tuple
+
+from app.data_classes import BuyOperation, SellOperation
+
+
+class LegacyOperation:
+    """
+    Replica del modelo anterior: atributos en __dict__ y datetime completo por operacion
+    """
+
+    def __init__(self, isin: str, str_date: str, description: str, qty: float, amount: float):
+        self.isin = isin
+        self.str_date = str_date
+        self.datetime = datetime.datetime.strptime(self.str_date, "%Y-%m-%d")
+        self.description = description
+        self.qty = qty
+        self.amount = amount
+
+
+class LegacyBuyOperation(LegacyOperation):
+    def __init__(self, isin: str, str_date: str, description: str, qty: float, amount: float):
+        super().__init__(isin, str_date, description, qty, amount)
+        self.comissions = 0 if "Savings" in self.description else 1
+        self.buy_price = (self.amount - self.comissions) / self.qty
+
+
+class LegacySellOperation(LegacyOperation):
+    def __init__(self, isin: str, str_date: str, description: str, qty: float, amount: float):
+        super().__init__(isin, str_date, description, qty, amount)
+        self.comissions = 1.0
+        self.taxes = 0.0
+        self.bruto = self.amount + self.comissions
+        self.sell_price = self.bruto / self.qty
+
+
+def build_synthetic_rows(n: int, n_isins: int = 200, seed: int = 7) -> List[Tuple[str, str, str, float, float]]:
+    """
+    Genera n filas (isin, fecha, descripcion, qty, amount); los textos se crean por fila, como al leer un JSON
+    """
+    rng: random.Random = random.Random(seed)
+    start: datetime.date = datetime.date(2019, 1, 1)
+    rows: List[Tuple[str, str, str, float, float]] = []
+    for idx in range(n):
+        isin: str = f"IE{rng.randrange(n_isins):010d}"
+        str_date: str = (start + datetime.timedelta(days=idx * 2500 // n)).isoformat()
+        kind: str = "Sell" if rng.random() < 0.2 else "Savings plan execution"
+        # -- Copia explicita para que cada fila tenga su propio objeto de texto, como con json.load (que no comparte
+        #    strings). isin[:1] + isin[1:] crea un objeto nuevo; "".join([isin]) devolveria el mismo objeto
+        rows.append((isin[:1] + isin[1:], str_date[:1] + str_date[1:], f"{kind} {isin}", rng.uniform(0.1, 5),
+                     rng.uniform(10, 500)))
+    return rows
+
+
+def measure(label: str, rows, buy_cls, sell_cls) -> int:
+    """
+    Construye las operaciones y devuelve los bytes retenidos segun tracemalloc
+    """
+    gc.collect()
+    tracemalloc.start()
+    start: float = time.perf_counter()
+    operations: list = [
+        sell_cls(isin, str_date, description, qty, amount) if description.startswith("Sell")
+        else buy_cls(isin, str_date, description, qty, amount)
+        for isin, str_date, description, qty, amount in rows
+    ]
+    elapsed: float = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<10} {current / 1024 / 1024:9.1f} MiB  {elapsed:6.2f} s  ({len(operations)} operaciones)")
+    del operations
+    return current
+
+
+def main(n: int = 1_000_000):
+    rows = build_synthetic_rows(n)
+    legacy: int = measure("anterior", rows, LegacyBuyOperation, LegacySellOperation)
+    slotted: int = measure("__slots__", rows, BuyOperation, SellOperation)
+    print(f"Reduccion de memoria: {100 * (1 - slotted / legacy):.1f}%")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
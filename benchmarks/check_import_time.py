@@ -0,0 +1,82 @@
+"""
+Comprobacion del tiempo de arranque de la CLI (import de main.py) con python -X importtime.
+
+Importa main en procesos nuevos, se queda con el mejor tiempo acumulado de varias ejecuciones (el primero se
+descarta: compila los .pyc) y falla si supera el presupuesto o si en el arranque se carga alguno de los modulos
+pesados que solo deben importarse al usar la funcionalidad que los necesita. Sale con codigo 1 si no se cumple.
+
+Uso (desde la raiz del proyecto):
+    python -m benchmarks.check_import_time [--budget-ms 100] [--runs 5]
+"""
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+PROJECT_ROOT: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# -- Presupuesto del import de main (acumulado, en ms). Con pandas en el arranque se supera con mucho margen
+DEFAULT_BUDGET_MS: float = 100.0
+
+# -- Modulos que no deben cargarse al arrancar la CLI
+FORBIDDEN_MODULES: tuple = ("pandas", "numpy", "pyarrow", "pypdf", "pprint", "info_tools", "constants_and_tools",
+                            "asyncio", "multiprocessing", "concurrent.futures.process", "pickle", "cProfile",
+                            "tracemalloc")
+
+
+def measure_import(module: str = "main") -> Tuple[float, Dict[str, float]]:
+    """
+    Importa el modulo en un proceso nuevo con -X importtime
+    :param module:
+    :return: Tiempo acumulado del import del modulo (ms) y tiempo acumulado de cada modulo importado (ms)
+    """
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=PROJECT_ROOT,
+                               capture_output=True, text=True, check=True)
+
+    # -- Cada linea es "import time: <propio us> | <acumulado us> | <sangria><modulo>"
+    cumulative_ms: Dict[str, float] = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts: List[str] = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        cumulative_ms[parts[2].strip()] = int(parts[1]) / 1000
+
+    return cumulative_ms[module], cumulative_ms
+
+
+def main(budget_ms: float = DEFAULT_BUDGET_MS, runs: int = 5) -> int:
+    # -- 1: La primera ejecucion compila los .pyc y no cuenta
+    measure_import()
+    timings: List[float] = []
+    imported: Dict[str, float] = {}
+    for _ in range(runs):
+        elapsed_ms, imported = measure_import()
+        timings.append(elapsed_ms)
+
+    # -- 2: Mejor tiempo (el menos afectado por ruido del sistema) y modulos prohibidos cargados
+    best_ms: float = min(timings)
+    forbidden: List[str] = sorted(name for name in imported if name.split(".")[0] in FORBIDDEN_MODULES
+                                  or name in FORBIDDEN_MODULES)
+    slowest: List[Tuple[str, float]] = sorted(((name, ms) for name, ms in imported.items() if name != "main"),
+                                              key=lambda item: item[1], reverse=True)[:10]
+
+    print(f"import main: {best_ms:.1f} ms (mejor de {runs}, presupuesto {budget_ms:.0f} ms)")
+    for name, ms in slowest:
+        print(f"  {ms:8.1f} ms  {name}")
+    for name in forbidden:
+        print(f"  - modulo cargado en el arranque: {name}")
+
+    ok: bool = best_ms <= budget_ms and not forbidden
+    print("Arranque OK" if ok else "Arranque fuera de presupuesto")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Comprueba el tiempo de import de main.py con -X importtime")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="Presupuesto del import de main (ms)")
+    parser.add_argument("--runs", type=int, default=5, help="Numero de ejecuciones medidas")
+    args = parser.parse_args()
+    sys.exit(main(args.budget_ms, args.runs))
@@ -0,0 +1,130 @@
+"""
+Comprobacion de paridad entre el motor FIFO de objetos (Active.calculate_fifo) y el motor vectorizado.
+
+Calcula ambos sobre el mismo extracto y compara, activo a activo, los totales, los sales_details (venta, impuestos,
+bruto, beneficios y tramos casados) y los lotes abiertos. Sale con codigo 1 si hay diferencias.
+
+Uso (desde la raiz del proyecto):
+    python -m benchmarks.check_vectorized_parity [ruta_extracto.json]
+"""
+import json
+import math
+import sys
+import time
+from typing import Any, Dict, List
+
+from app.portfolio import Portfolio
+from app.vectorized_fifo import VectorizedFifoEngine
+
+ALLOWED_TYPES: List[str] = ["Operar"]
+EXCLUDED_INITIAL_ISIN: List[str] = ["XF"]
+
+# -- Las cantidades de ambos motores son enteros de micro-participaciones y se comparan exactamente. Los importes del
+#    motor vectorizado son float (coste por tramo = cantidad x precio) y difieren del reparto entero del motor de
+#    objetos en errores de redondeo de este orden
+ABS_TOLERANCE: float = 1e-6
+REL_TOLERANCE: float = 1e-9
+
+
+def close(a: float, b: float) -> bool:
+    return math.isclose(a, b, rel_tol=REL_TOLERANCE, abs_tol=ABS_TOLERANCE)
+
+
+def compare_actives(reference: Portfolio, candidate: Portfolio) -> List[str]:
+    """
+    Compara dos portfolios calculados sobre el mismo extracto y devuelve la lista de diferencias encontradas
+    """
+    errors: List[str] = []
+    for ref in reference:
+        cand = candidate.get(ref.isin)
+        ref_positions: Dict[int, int] = {id(op): pos for pos, op in enumerate(ref.operations_list)}
+        cand_positions: Dict[int, int] = {id(op): pos for pos, op in enumerate(cand.operations_list)}
+        for attr in ("total_gross_proffit", "total_net_proffit", "total_comissions", "total_taxes"):
+            if not close(getattr(ref, attr), getattr(cand, attr)):
+                errors.append(f"{ref.isin} {attr}: {getattr(ref, attr)} != {getattr(cand, attr)}")
+
+        if len(ref.sales_details) != len(cand.sales_details):
+            errors.append(f"{ref.isin} numero de ventas: {len(ref.sales_details)} != {len(cand.sales_details)}")
+            continue
+
+        for idx, (ref_detail, cand_detail) in enumerate(zip(ref.sales_details, cand.sales_details)):
+            ref_sell, cand_sell = ref_detail["sell_operation"], cand_detail["sell_operation"]
+            for key, ref_value, cand_value in (
+                    ("taxes", ref_sell.taxes, cand_sell.taxes),
+                    ("bruto", ref_sell.bruto, cand_sell.bruto),
+                    ("sell_price", ref_sell.sell_price, cand_sell.sell_price),
+                    ("gross_profit", ref_detail["gross_profit"], cand_detail["gross_profit"]),
+                    ("net_profit", ref_detail["net_profit"], cand_detail["net_profit"])):
+                if not close(ref_value, cand_value):
+                    errors.append(f"{ref.isin} venta {idx} {key}: {ref_value} != {cand_value}")
+
+            ref_legs = ref_detail["matched_buys"]
+            cand_legs = cand_detail["matched_buys"]
+            if len(ref_legs) != len(cand_legs):
+                errors.append(f"{ref.isin} venta {idx} numero de tramos: {len(ref_legs)} != {len(cand_legs)}")
+                continue
+            for ref_leg, cand_leg in zip(ref_legs, cand_legs):
+                if (ref_positions[id(ref_leg["buy_operation"])] != cand_positions[id(cand_leg["buy_operation"])]
+                        or ref_leg["matched_qty"] != cand_leg["matched_qty"]):
+                    errors.append(f"{ref.isin} venta {idx} tramo distinto: {ref_leg['buy_operation'].str_date} "
+                                  f"{ref_leg['matched_qty']} != {cand_leg['buy_operation'].str_date} {cand_leg['matched_qty']}")
+
+        ref_open = [(op.str_date, op.qty) for op in ref.opened_operations_list]
+        cand_open = [(op.str_date, op.qty) for op in cand.opened_operations_list]
+        if ref_open != cand_open:
+            errors.append(f"{ref.isin} lotes abiertos distintos")
+
+    return errors
+
+
+def check_rows(rows: List[Dict[str, Any]]) -> List[str]:
+    """
+    Calcula ambos motores sobre las filas y devuelve las diferencias. El motor vectorizado se ejecuta desde las filas
+    (load) y desde el portfolio ya agregado (load_portfolio, el camino de main.py)
+    """
+    reference: Portfolio = Portfolio()
+    reference.ingest(rows, ALLOWED_TYPES, EXCLUDED_INITIAL_ISIN)
+    for active in reference:
+        active.calculate_fifo()
+
+    errors: List[str] = []
+    engine: VectorizedFifoEngine = VectorizedFifoEngine(ALLOWED_TYPES, EXCLUDED_INITIAL_ISIN)
+    for source in ("load", "load_portfolio"):
+        candidate: Portfolio = Portfolio()
+        candidate.ingest(rows, ALLOWED_TYPES, EXCLUDED_INITIAL_ISIN)
+        df = engine.load(rows) if source == "load" else engine.load_portfolio(candidate)
+        engine.run(df).apply_to_portfolio(candidate)
+        errors.extend(f"[{source}] {error}" for error in compare_actives(reference, candidate))
+    return errors
+
+
+def main(input_path: str = "data/input_data/extracto_ines.json") -> int:
+    with open(input_path, 'r', encoding='utf-8') as f:
+        rows: List[Dict[str, Any]] = json.load(f)
+
+    # -- 1: Motor de objetos
+    reference: Portfolio = Portfolio()
+    reference.ingest(rows, ALLOWED_TYPES, EXCLUDED_INITIAL_ISIN)
+    start: float = time.perf_counter()
+    for active in reference:
+        active.calculate_fifo()
+    objects_elapsed: float = time.perf_counter() - start
+
+    # -- 2: Motor vectorizado
+    engine: VectorizedFifoEngine = VectorizedFifoEngine(ALLOWED_TYPES, EXCLUDED_INITIAL_ISIN)
+    start = time.perf_counter()
+    engine.run(engine.load(rows))
+    vectorized_elapsed: float = time.perf_counter() - start
+
+    # -- 3: Paridad sobre el extracto y sobre un extracto vacio (sin operaciones, columnas vacias)
+    errors: List[str] = check_rows(rows) + [f"extracto vacio: {error}" for error in check_rows([])]
+    print(f"Motor de objetos: {objects_elapsed:.3f} s, motor vectorizado: {vectorized_elapsed:.3f} s "
+          f"({len(rows)} filas, {len(reference)} activos)")
+    for error in errors[:50]:
+        print(f"  - {error}")
+    print("Paridad OK" if not errors else f"{len(errors)} diferencias")
+    return 0 if not errors else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(*sys.argv[1:]))
@@ -0,0 +1,218 @@
+"""
+Suite de benchmarks del pipeline de extraccion sobre extractos sinteticos.
+
+Mide la ingesta (Portfolio.ingest), Active.calculate_fifo, los dos exportadores (activos y ventas historicas) y la
+ejecucion completa de Main para varios tamaños de extracto. Los extractos se generan con benchmarks.synthetic_extract
+y se reutilizan entre ejecuciones (benchmarks/data); los resultados se guardan en benchmarks/results/<commit>.json
+para poder compararlos entre commits.
+
+Uso (desde la raiz del proyecto):
+    python -m benchmarks.run_suite [--sizes 10000 100000 1000000] [--cases ingest fifo ...] [--repeat 3]
+    python -m benchmarks.run_suite --compare COMMIT_BASE [COMMIT_NUEVO]
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.exporters import iter_sales_history, write_json_items
+from app.portfolio import Portfolio
+from app.streaming import iter_extract_rows
+from benchmarks.synthetic_extract import write_extract
+from main import Main
+
+BENCHMARKS_DIR: str = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR: str = os.path.join(BENCHMARKS_DIR, "data")
+RESULTS_DIR: str = os.path.join(BENCHMARKS_DIR, "results")
+
+DEFAULT_SIZES: List[int] = [10_000, 100_000, 1_000_000]
+ALLOWED_TYPES: List[str] = ["Operar"]
+EXCLUDED_INITIAL_ISIN: List[str] = ["XF"]
+
+
+def ensure_extract(n_rows: int, seed: int) -> str:
+    """
+    Devuelve la ruta del extracto sintetico de n_rows filas, generandolo si aun no existe
+    """
+    os.makedirs(DATA_DIR, exist_ok=True)
+    file_path: str = os.path.join(DATA_DIR, f"synthetic_{n_rows}_{seed}.json")
+    if not os.path.exists(file_path):
+        tmp_path: str = f"{file_path}.tmp"
+        write_extract(tmp_path, n_rows, n_isins=max(20, n_rows // 5_000), seed=seed)
+        os.replace(tmp_path, file_path)
+    return file_path
+
+
+def _ingest(input_path: str) -> Portfolio:
+    portfolio: Portfolio = Portfolio()
+    portfolio.ingest(iter_extract_rows(input_path), ALLOWED_TYPES, EXCLUDED_INITIAL_ISIN)
+    return portfolio
+
+
+def _ingest_and_fifo(input_path: str) -> Portfolio:
+    portfolio: Portfolio = _ingest(input_path)
+    for active in portfolio:
+        active.calculate_fifo()
+    return portfolio
+
+
+def _calculate_fifo(portfolio: Portfolio):
+    for active in portfolio:
+        active.calculate_fifo()
+
+
+def _export_json(portfolio: Portfolio, output_dir: str):
+    with open(os.path.join(output_dir, "activos.json"), 'w', encoding='utf-8') as f:
+        write_json_items(f, (active.to_dict() for active in portfolio))
+
+
+def _export_sales_history(portfolio: Portfolio, output_dir: str):
+    with open(os.path.join(output_dir, "ventas.json"), 'w', encoding='utf-8') as f:
+        write_json_items(f, iter_sales_history(portfolio))
+
+
+def _end_to_end(input_path: str, output_dir: str):
+    main = Main(input_path=input_path, output_dir=output_dir, print_report=False)
+    main.export_to_json()
+    main.export_sales_history()
+
+
+# -- Cada caso devuelve (preparacion fuera de la medicion, funcion medida a partir de lo preparado)
+CASES: Dict[str, Callable[[str, str], Tuple[Callable[[], Any], Callable[[Any], Any]]]] = {
+    "ingest": lambda input_path, output_dir: (lambda: None, lambda _: _ingest(input_path)),
+    "fifo": lambda input_path, output_dir: (lambda: _ingest(input_path), _calculate_fifo),
+    "export_json": lambda input_path, output_dir: (
+        lambda: _ingest_and_fifo(input_path), lambda portfolio: _export_json(portfolio, output_dir)),
+    "export_sales_history": lambda input_path, output_dir: (
+        lambda: _ingest_and_fifo(input_path), lambda portfolio: _export_sales_history(portfolio, output_dir)),
+    "end_to_end": lambda input_path, output_dir: (lambda: None, lambda _: _end_to_end(input_path, output_dir)),
+}
+
+
+def run_case(case: str, input_path: str, n_rows: int, repeat: int) -> Dict[str, Any]:
+    """
+    Ejecuta un caso repeat veces (preparando el estado antes de cada repeticion) y resume los tiempos
+    :param case:
+    :param input_path:
+    :param n_rows:
+    :param repeat:
+    :return:
+    """
+    timings: List[float] = []
+    with tempfile.TemporaryDirectory(prefix="bench_") as output_dir:
+        setup, measured = CASES[case](input_path, output_dir)
+        for _ in range(repeat):
+            state: Any = setup()
+            start: float = time.perf_counter()
+            measured(state)
+            timings.append(time.perf_counter() - start)
+
+    best: float = min(timings)
+    return {
+        "repeat": repeat,
+        "min_s": best,
+        "median_s": statistics.median(timings),
+        "rows_per_s": n_rows / best if best > 0 else None
+    }
+
+
+def git_commit() -> Tuple[str, bool]:
+    """
+    Devuelve el commit actual (abreviado) y si el arbol de trabajo tiene cambios sin confirmar
+    """
+    try:
+        commit: str = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BENCHMARKS_DIR,
+                                              text=True, stderr=subprocess.DEVNULL).strip()
+        dirty: bool = bool(subprocess.check_output(["git", "status", "--porcelain", "--untracked-files=no"],
+                                                   cwd=BENCHMARKS_DIR, text=True, stderr=subprocess.DEVNULL).strip())
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", True
+    return commit, dirty
+
+
+def save_results(results: Dict[str, Dict[str, Any]], config: Dict[str, Any]) -> str:
+    """
+    Guarda los resultados en benchmarks/results/<commit>.json (con sufijo -dirty si hay cambios sin confirmar)
+    """
+    commit, dirty = git_commit()
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    file_path: str = os.path.join(RESULTS_DIR, f"{commit}{'-dirty' if dirty else ''}.json")
+
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            "commit": commit,
+            "dirty": dirty,
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "config": config,
+            "results": results
+        }, f, indent=4, ensure_ascii=False)
+    return file_path
+
+
+def _load_results(name: str) -> Dict[str, Any]:
+    file_path: str = name if name.endswith(".json") else os.path.join(RESULTS_DIR, f"{name}.json")
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare_results(base: str, other: Optional[str] = None):
+    """
+    Imprime la comparacion de tiempos (minimo) entre dos ficheros de resultados
+    :param base: Commit (o ruta) de referencia
+    :param other: Commit (o ruta) a comparar; por defecto el commit actual
+    :return:
+    """
+    if other is None:
+        commit, dirty = git_commit()
+        other = f"{commit}{'-dirty' if dirty else ''}"
+    base_results: Dict[str, Any] = _load_results(base)["results"]
+    other_results: Dict[str, Any] = _load_results(other)["results"]
+
+    print(f"{'filas':>9}  {'caso':<22} {base:>14} {other:>14}  cambio")
+    for size, cases in base_results.items():
+        for case, base_case in cases.items():
+            other_case: Optional[Dict[str, Any]] = other_results.get(size, {}).get(case)
+            if other_case is None:
+                continue
+            ratio: float = other_case["min_s"] / base_case["min_s"]
+            print(f"{size:>9}  {case:<22} {base_case['min_s']:>13.3f}s {other_case['min_s']:>13.3f}s  x{ratio:.2f}")
+
+
+def main(sizes: List[int], cases: List[str], repeat: int, seed: int):
+    results: Dict[str, Dict[str, Any]] = {}
+    for n_rows in sizes:
+        input_path: str = ensure_extract(n_rows, seed)
+        results[str(n_rows)] = {}
+        for case in cases:
+            case_result: Dict[str, Any] = run_case(case, input_path, n_rows, repeat)
+            results[str(n_rows)][case] = case_result
+            print(f"{n_rows:>9}  {case:<22} {case_result['min_s']:8.3f} s  "
+                  f"(mediana {case_result['median_s']:.3f} s, {case_result['rows_per_s']:,.0f} filas/s)")
+
+    file_path: str = save_results(results, {"sizes": sizes, "cases": cases, "repeat": repeat, "seed": seed})
+    print(f"Resultados guardados en: {file_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Suite de benchmarks del pipeline sobre extractos sinteticos")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Tamaños de extracto (filas)")
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES), help="Casos a ejecutar")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones de cada caso (se guarda el minimo y la mediana)")
+    parser.add_argument("--seed", type=int, default=42, help="Semilla de los extractos sinteticos")
+    parser.add_argument("--compare", nargs="+", metavar="COMMIT",
+                        help="Compara los resultados guardados de dos commits (o de uno con el actual)")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare_results(*args.compare[:2])
+    else:
+        main(args.sizes, args.cases, args.repeat, args.seed)
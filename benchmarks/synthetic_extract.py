@@ -0,0 +1,163 @@
+"""
+Generador de extractos sinteticos de Trade Republic con el mismo esquema que consume Main
+(date_iso, type, description, isin, name, quantity, incoming_amount, outgoing_amount).
+
+El generador es determinista (semilla) y permite ajustar el numero de ISIN, la proporcion de ejecuciones de plan de
+ahorro frente a compras sueltas, la proporcion y fragmentacion de las ventas y el ruido que Main descarta (ISIN con
+prefijo "XF" y filas de tipos distintos de "Operar"). Las ventas nunca superan la posicion abierta del activo.
+
+Uso (desde la raiz del proyecto):
+    python -m benchmarks.synthetic_extract RUTA --rows 100000 [--isins 20] [--format json|ndjson]
+"""
+import argparse
+import datetime
+import json
+import math
+import random
+from typing import Any, Dict, Iterator, List
+
+# -- Prefijos de los ISIN generados (los "IE" tributan con retencion desde TAX_WITHHOLDING_START_DATE)
+ISIN_PREFIXES: tuple = ("IE", "US", "DE")
+
+# -- Tipos de fila que Main descarta
+NOISE_TYPES: tuple = ("Interés", "Transferencia")
+
+
+def _build_universe(n_isins: int, prefix_pool: tuple, rng: random.Random, label: str) -> List[Dict[str, Any]]:
+    """
+    Genera n_isins activos con ISIN, nombre y precio inicial
+    """
+    return [
+        {
+            "isin": f"{prefix_pool[idx % len(prefix_pool)]}{idx:010d}",
+            "name": f"{label} {idx}",
+            "price": rng.uniform(5, 500),
+            "qty": 0.0
+        }
+        for idx in range(n_isins)
+    ]
+
+
+def _floor_qty(qty: float) -> float:
+    """
+    Redondea una cantidad hacia abajo a 6 decimales (como los extractos) para no vender mas de lo que hay
+    """
+    return math.floor(qty * 1e6) / 1e6
+
+
+def generate_rows(n_rows: int, n_isins: int = 20, savings_plan_ratio: float = 0.5, sell_ratio: float = 0.1,
+                  sell_fragments: int = 3, noise_ratio: float = 0.1, start_date: str = "2018-01-01",
+                  years: float = 10, seed: int = 42) -> Iterator[Dict[str, Any]]:
+    """
+    Genera las filas de un extracto sintetico en orden cronologico
+    :param n_rows: Numero total de filas (incluido el ruido)
+    :param n_isins: Numero de ISIN con operaciones validas
+    :param savings_plan_ratio: Proporcion de compras que son ejecuciones de plan de ahorro (el resto son "Buy trade")
+    :param sell_ratio: Probabilidad de que una fila inicie una venta
+    :param sell_fragments: Numero maximo de filas en las que se fragmenta cada venta (mismo dia y activo)
+    :param noise_ratio: Proporcion de filas de ruido (ISIN "XF" o tipos distintos de "Operar")
+    :param start_date: Fecha ISO de la primera fila
+    :param years: Años que abarca el extracto (las fechas avanzan uniformemente)
+    :param seed: Semilla del generador aleatorio
+    :return:
+    """
+    rng: random.Random = random.Random(seed)
+    universe: List[Dict[str, Any]] = _build_universe(n_isins, ISIN_PREFIXES, rng, "Activo")
+    noise_universe: List[Dict[str, Any]] = _build_universe(max(1, n_isins // 10), ("XF",), rng, "Cripto")
+
+    start_ordinal: int = datetime.date.fromisoformat(start_date).toordinal()
+    rows_per_day: float = max(1.0, n_rows / (years * 365))
+    emitted: int = 0
+
+    while emitted < n_rows:
+        str_date: str = datetime.date.fromordinal(start_ordinal + int(emitted / rows_per_day)).isoformat()
+        asset: Dict[str, Any] = rng.choice(universe)
+        asset["price"] = max(0.5, asset["price"] * rng.gauss(1.0, 0.01))
+
+        # -- 1: Ruido que Main debe descartar
+        if rng.random() < noise_ratio:
+            if rng.random() < 0.5:
+                noise_asset: Dict[str, Any] = rng.choice(noise_universe)
+                row_type, row_isin, row_name = "Operar", noise_asset["isin"], noise_asset["name"]
+            else:
+                row_type, row_isin, row_name = rng.choice(NOISE_TYPES), asset["isin"], asset["name"]
+            amount: float = round(rng.uniform(10, 500), 2)
+            yield {"date_iso": str_date, "type": row_type, "description": f"Buy trade {row_isin}", "isin": row_isin,
+                   "name": row_name, "quantity": round(amount / asset["price"], 6), "incoming_amount": 0,
+                   "outgoing_amount": amount}
+            emitted += 1
+            continue
+
+        # -- 2: Venta fragmentada de parte de la posicion abierta
+        if asset["qty"] > 0.01 and rng.random() < sell_ratio:
+            remaining: float = _floor_qty(asset["qty"] * rng.uniform(0.1, 0.6))
+            n_fragments: int = min(rng.randint(1, max(1, sell_fragments)), n_rows - emitted)
+            for fragment in range(n_fragments):
+                qty: float = remaining if fragment == n_fragments - 1 else _floor_qty(remaining * rng.uniform(0.2, 0.8))
+                if qty <= 0:
+                    break
+                remaining = round(remaining - qty, 6)
+                asset["qty"] = round(asset["qty"] - qty, 6)
+                yield {"date_iso": str_date, "type": "Operar",
+                       "description": f"Sell trade {asset['isin']} {asset['name']}", "isin": asset["isin"],
+                       "name": asset["name"], "quantity": qty, "incoming_amount": round(qty * asset["price"], 2),
+                       "outgoing_amount": 0}
+                emitted += 1
+            continue
+
+        # -- 3: Compra (plan de ahorro o compra suelta)
+        if rng.random() < savings_plan_ratio:
+            description: str = f"Savings plan execution {asset['isin']}"
+            amount = float(rng.choice((25, 50, 100, 150, 250, 500)))
+        else:
+            description = f"Buy trade {asset['isin']}"
+            amount = round(rng.uniform(50, 3000), 2)
+        qty = round(amount / asset["price"], 6)
+        asset["qty"] = round(asset["qty"] + qty, 6)
+        yield {"date_iso": str_date, "type": "Operar", "description": description, "isin": asset["isin"],
+               "name": asset["name"], "quantity": qty, "incoming_amount": 0, "outgoing_amount": amount}
+        emitted += 1
+
+
+def write_extract(file_path: str, n_rows: int, output_format: str = "json", **config) -> str:
+    """
+    Escribe un extracto sintetico fila a fila (array JSON como los extractos reales, o NDJSON)
+    :param file_path:
+    :param n_rows:
+    :param output_format: "json" o "ndjson"
+    :param config: Parametros de generate_rows
+    :return: Ruta del fichero
+    """
+    with open(file_path, 'w', encoding='utf-8') as f:
+        if output_format == "ndjson":
+            for row in generate_rows(n_rows, **config):
+                f.write(json.dumps(row, ensure_ascii=False))
+                f.write("\n")
+        else:
+            f.write("[")
+            for idx, row in enumerate(generate_rows(n_rows, **config)):
+                if idx:
+                    f.write(", ")
+                f.write(json.dumps(row, ensure_ascii=False))
+            f.write("]")
+    return file_path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera un extracto sintetico de Trade Republic")
+    parser.add_argument("path", help="Ruta del extracto a generar")
+    parser.add_argument("--rows", type=int, default=100_000, help="Numero de filas")
+    parser.add_argument("--isins", type=int, default=20, help="Numero de ISIN con operaciones validas")
+    parser.add_argument("--savings-plan-ratio", type=float, default=0.5,
+                        help="Proporcion de compras que son ejecuciones de plan de ahorro")
+    parser.add_argument("--sell-ratio", type=float, default=0.1, help="Probabilidad de que una fila inicie una venta")
+    parser.add_argument("--sell-fragments", type=int, default=3, help="Numero maximo de filas por venta")
+    parser.add_argument("--noise-ratio", type=float, default=0.1, help="Proporcion de filas XF u otros tipos")
+    parser.add_argument("--seed", type=int, default=42, help="Semilla del generador")
+    parser.add_argument("--format", choices=["json", "ndjson"], default="json", help="Formato del extracto")
+    args = parser.parse_args()
+
+    write_extract(args.path, args.rows, args.format, n_isins=args.isins, savings_plan_ratio=args.savings_plan_ratio,
+                  sell_ratio=args.sell_ratio, sell_fragments=args.sell_fragments, noise_ratio=args.noise_ratio,
+                  seed=args.seed)
+    print(f"Extracto sintetico de {args.rows} filas generado en: {args.path}")
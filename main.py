@@ -1,149 +1,400 @@
+import argparse
+import functools
 import json
 import os
 import datetime
-from typing import List, Literal
+from typing import TYPE_CHECKING, Any, Dict, List, Literal, Optional
+
+from app.data_classes import Active
+from app.portfolio import Portfolio
+from app.streaming import iter_extract_rows
+from app.exporters import OUTPUT_FORMATS, OutputFormat, file_extension, iter_sales_history, write_json_items
+from app.profiling import PipelineProfiler
+from app.report import REPORT_MODES, ReportMode, ReportRenderer
+
+# -- Los modulos que solo necesitan algunos modos (cache, checkpoints, procesos, batch, tablas columnares, motor
+#    vectorizado, PDF, servicio, precios) se importan al usarlos, para que el arranque de la CLI no los pague
+if TYPE_CHECKING:
+    from constants_and_tools import ConstantsAndTools
+    from app.result_cache import ResultCache
 
-import pandas as pd
-from constants_and_tools import ConstantsAndTools
-from app.data_classes import Active, Operation, BuyOperation, SellOperation
-import pprint
 
 class Main:
-    def __init__(self):
-        self.CT: ConstantsAndTools = ConstantsAndTools()
-        with open('data/input_data/extracto_ines.json', 'r', encoding='utf-8') as f:
-            self.extracto: dict = json.load(f)
+    def __init__(self, incremental: bool = False, engine: Literal["objects", "vectorized"] = "objects",
+                 workers: int = 1, input_path: str = 'data/input_data/extracto_ines.json',
+                 output_dir: str = "data/output_data", print_report: bool = True, use_cache: bool = False,
+                 lazy: bool = False, profile: bool = False, trace_memory: bool = False, cprofile: bool = False,
+                 report: ReportMode = "console", report_path: Optional[str] = None):
+        """
+        :param incremental: Si es True, reanuda el calculo FIFO desde el checkpoint del extracto y solo procesa las
+        operaciones nuevas (si el historico ha cambiado, el activo se recalcula desde cero)
+        :param engine: Motor FIFO: "objects" (Active.calculate_fifo) o "vectorized" (pandas/NumPy sobre todo el extracto)
+        :param workers: Numero de procesos para el motor de objetos (1 = calculo en serie en este proceso). No aplica
+        en modo incremental ni con el motor vectorizado. Si el extracto es un PDF, es tambien el numero de procesos
+        que extraen sus paginas
+        :param input_path: Ruta del extracto (array JSON, NDJSON o el PDF original)
+        :param output_dir: Directorio donde se escriben las exportaciones
+        :param print_report: Si es False no se genera el reporte FIFO de cada activo (equivale a report="off")
+        :param use_cache: Si es True, reutiliza el resultado guardado en data/cache si el extracto y las reglas de
+        comisiones/impuestos no han cambiado
+        :param lazy: Si es True solo se leen las operaciones; el FIFO de cada activo se calcula bajo demanda al
+        consultarlo (self.portfolio.realized / self.portfolio.open_lots) y no se imprime el reporte
+        :param profile: Si es True se miden los tiempos de cada etapa, los contadores de filas/operaciones/lotes y el
+        pico de memoria (ver export_profile)
+        :param trace_memory: Si es True el pico de memoria de Python se mide ademas con tracemalloc (mas lento)
+        :param cprofile: Si es True se perfila ademas la ejecucion con cProfile
+        :param report: Modo del reporte FIFO: "console" (InfoTools, una linea cada vez), "off", "summary" (solo
+        totales), "buffered" (texto plano escrito de una vez) o "file"
+        :param report_path: Fichero del modo "file" (por defecto reporte_fifo_<fecha>.txt en output_dir)
+        """
+        self.profiler: PipelineProfiler = PipelineProfiler(enabled=profile, trace_memory=trace_memory, use_cprofile=cprofile)
+        self.input_path: str = input_path
+        self.output_dir: str = output_dir
+        self.pdf_workers: int = workers
 
-        # -- Lista que va a contener los diferentes activos
-        self.actives_list: List[Active] = []
+        # -- Registro que va a contener los diferentes activos (indexado por ISIN)
+        self.portfolio: Portfolio = Portfolio()
 
         # -- Listas de restricciones
         self.allowed_types: List[str] = ["Operar"]
         self.excluded_initial_isin: List[str] = ["XF"]
 
-        # -- Itero por cada fila del extracto
-        for elem in self.extracto:
-            elem_str_date: str = elem["date_iso"]
-            elem_type: str = elem["type"]
-            elem_description: str = elem["description"]
-            elem_isin: str = elem["isin"]
-            elem_name: str = elem["name"]
-            elem_quantity: float = elem["quantity"]
-            elem_incoming_amount: float = elem["incoming_amount"]
-            elem_outgoing_amount: float = elem["outgoing_amount"]
-
-            # -- Aplico restricciones
-            if elem_type not in self.allowed_types:
-                continue
-            
-            # Corrección: elem_isin.startswith espera una tupla o string, no "self.excluded_initial_isin" como string literal
-            # Además, excluded_initial_isin es una lista, así que iteramos o usamos tupla
-            if any(elem_isin.startswith(prefix) for prefix in self.excluded_initial_isin):
-                continue
-
-            # -- Defino si es compra o venta
-            # Nota: incoming_amount > 0 suele ser venta (entra dinero), outgoing_amount > 0 suele ser compra (sale dinero)
-            # El código original tenía: elem_buy_or_sell = 'buy' if elem_outgoing_amount > 0 else 'sell'
-            # Asumimos que outgoing_amount es positivo en compras.
-            
-            # amount para pasar al metodo add_operation
-            amount = elem_outgoing_amount if elem_outgoing_amount > 0 else elem_incoming_amount
-
-            # Buscamos si el activo ya existe en la lista
-            active_found = None
-            for active in self.actives_list:
-                if active.isin == elem_isin:
-                    active_found = active
-                    break
-            
-            # Si no existe, lo creamos
-            if not active_found:
-                # Si es una venta y no existe el activo, podría ser un error de datos o una venta en corto (no soportada explícitamente pero la creamos igual)
-                # O simplemente es la primera operación y es una compra.
-                active_found = Active(isin=elem_isin, name=elem_name)
-                self.actives_list.append(active_found)
-            
-            # Agregamos la operación al activo encontrado o recién creado
-            # El metodo add_operation ya se encarga de crear BuyOperation o SellOperation internamente
-            # y de actualizar current_qty
-            active_found.add_operation(
-                isin=elem_isin,
-                str_date=elem_str_date,
-                description=elem_description,
-                qty=elem_quantity,
-                amount=amount
-            )
+        # -- En modo perezoso solo se leen las operaciones; el FIFO se calcula al consultar cada activo
+        if lazy:
+            self.ingest()
+            return
+
+        # -- Si la cache esta activada y el extracto y las reglas no han cambiado, reutilizo el resultado guardado
+        result_cache: Optional["ResultCache"] = None
+        if use_cache:
+            from app.result_cache import ResultCache
+            result_cache = ResultCache()
+        cache_key: Optional[str] = None
+        cached_portfolio: Optional[Portfolio] = None
+        if result_cache is not None:
+            cache_key = result_cache.key_for(self.input_path, self.allowed_types, self.excluded_initial_isin)
+            cached_portfolio = result_cache.load(cache_key)
+
+        if cached_portfolio is not None:
+            self.portfolio = cached_portfolio
+            self.profiler.count("cache_hits")
+        else:
+            self.build_portfolio(incremental=incremental, engine=engine, workers=workers)
+            if result_cache is not None:
+                result_cache.store(cache_key, self.portfolio)
+
+        if print_report:
+            with self.profiler.stage("print_report"):
+                self.build_report_renderer(report, report_path).render(self.portfolio)
+
+    @functools.cached_property
+    def CT(self) -> "ConstantsAndTools":
+        """
+        Instancia de ConstantsAndTools, que se crea (e importa) la primera vez que se usa
+        """
+        from constants_and_tools import ConstantsAndTools
+        return ConstantsAndTools()
+
+    def build_report_renderer(self, report: ReportMode, report_path: Optional[str] = None) -> ReportRenderer:
+        """
+        Crea el renderizador del reporte FIFO; en modo "file" el reporte se escribe por defecto junto a las exportaciones
+        """
+        if report == "file" and report_path is None:
+            os.makedirs(self.output_dir, exist_ok=True)
+            report_path = os.path.join(self.output_dir, f"reporte_fifo_{datetime.date.today().isoformat()}.txt")
+        return ReportRenderer(report, report_path)
+
+    def ingest(self):
+        """
+        Recorre el extracto fila a fila (sin cargar el documento entero), aplica restricciones y agrega las
+        operaciones a su activo
+        """
+        # -- La lectura/parseo del extracto se imputa a "read_rows"; "ingest" incluye ademas el filtrado, la busqueda
+        #    del activo y la construccion de las operaciones
+        rows = self.profiler.timed_iter("read_rows", iter_extract_rows(self.input_path, pdf_workers=self.pdf_workers), counter="rows_read")
+        with self.profiler.stage("ingest"):
+            n_operations: int = self.portfolio.ingest(rows, self.allowed_types, self.excluded_initial_isin)
+        self.profiler.count("operations", n_operations)
+        self.profiler.count("actives", len(self.portfolio))
+
+    def build_portfolio(self, incremental: bool, engine: Literal["objects", "vectorized"], workers: int):
+        """
+        Lee el extracto, agrega las operaciones a cada activo y calcula el FIFO
+        """
+        self.ingest()
 
         # -- Una vez procesadas todas las operaciones, calculamos FIFO para cada activo
-        for active in self.actives_list:
-            active.calculate_fifo()
-            active.print_fifo_report()
+        with self.profiler.stage("fifo"):
+            self.calculate_fifo(incremental=incremental, engine=engine, workers=workers)
+
+        if self.profiler.enabled:
+            self.count_results()
+
+    def count_results(self):
+        """
+        Acumula en el perfil el numero de ventas, tramos de compra casados y lotes abiertos calculados
+        """
+        for active in self.portfolio:
+            self.profiler.count("sales", len(active.sales_details))
+            self.profiler.count("matched_buys", sum(len(detail["matched_buys"]) for detail in active.sales_details))
+            self.profiler.count("open_lots", len(active.opened_operations_list))
+
+    def calculate_fifo(self, incremental: bool, engine: Literal["objects", "vectorized"], workers: int):
+        """
+        Calcula el FIFO de todos los activos con el motor indicado
+        """
+        if incremental:
+            from app.fifo_checkpoint import FifoCheckpoint
+            checkpoint: FifoCheckpoint = FifoCheckpoint(FifoCheckpoint.path_for(self.input_path)).load()
+            checkpoint.apply(self.portfolio)
+            checkpoint.save(self.portfolio)
+        elif engine == "vectorized":
+            # -- Import diferido: solo este motor necesita pandas/NumPy
+            from app.vectorized_fifo import VectorizedFifoEngine
+            vectorized_engine: VectorizedFifoEngine = VectorizedFifoEngine(self.allowed_types, self.excluded_initial_isin)
+            # -- Las operaciones ya estan en el portfolio (ingest): el DataFrame se construye desde ellas sin releer el extracto
+            vectorized_engine.run(vectorized_engine.load_portfolio(self.portfolio)).apply_to_portfolio(self.portfolio)
+        elif workers > 1:
+            from app.parallel_fifo import ParallelFifoRunner
+            ParallelFifoRunner(workers).run(self.portfolio)
+        else:
+            for active in self.portfolio:
+                active.calculate_fifo()
 
-    def export_to_json(self):
+    def export_to_json(self, output_format: OutputFormat = "indent") -> str:
         """
-        Exporta la lista de activos a un archivo JSON.
+        Exporta la lista de activos a un archivo JSON, escribiendo un activo cada vez.
+        :param output_format: "indent" (por defecto), "compact" o "ndjson"
         """
-        output_dir = "data/output_data"
+        output_dir = self.output_dir
         os.makedirs(output_dir, exist_ok=True)
-        
+
         today_str = datetime.date.today().isoformat()
-        file_path = os.path.join(output_dir, f"{today_str}.json")
-        
-        data_to_export = [active.to_dict() for active in self.actives_list]
-        
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data_to_export, f, indent=4, ensure_ascii=False)
-            
+        file_path = os.path.join(output_dir, f"{today_str}.{file_extension(output_format)}")
+
+        with self.profiler.stage("export_json"), open(file_path, 'w', encoding='utf-8') as f:
+            write_json_items(f, (active.to_dict() for active in self.portfolio), output_format)
+
         print(f"Datos exportados correctamente a: {file_path}")
+        return file_path
 
-    def export_sales_history(self):
+    def export_sales_history(self, output_format: OutputFormat = "indent") -> str:
         """
-        Obtiene todos los sales details de cada activo, los unifica en una lista,
-        los ordena por fecha descendente y los exporta a un JSON.
+        Obtiene todos los sales details de cada activo y los exporta a un JSON por fecha descendente.
+        Las ventas de cada activo se mezclan en orden (k-way merge) y se escriben una a una.
+        :param output_format: "indent" (por defecto), "compact" o "ndjson"
         """
-        output_dir = "data/output_data"
+        output_dir = self.output_dir
         os.makedirs(output_dir, exist_ok=True)
 
-        all_sales = []
-
-        for active in self.actives_list:
-            for detail in active.sales_details:
-                # Construimos un diccionario plano con la info del activo y el detalle serializado
-                sale_entry = {
-                    "active_name": active.name,
-                    "active_isin": active.isin,
-                    # Usamos la fecha de la venta para ordenar
-                    "sell_date": detail['sell_operation'].str_date,
-                    "sell_operation": detail['sell_operation'].to_dict(),
-                    "gross_profit": detail['gross_profit'],
-                    "net_profit": detail['net_profit'],
-                    "comissions": detail['comissions'],
-                    "taxes": detail['taxes'],
-                    "matched_buys": [
-                        {
-                            "buy_operation": match["buy_operation"].to_dict(),
-                            "matched_qty": match["matched_qty"],
-                            "buy_price": match["buy_price"]
-                        }
-                        for match in detail["matched_buys"]
-                    ]
-                }
-                all_sales.append(sale_entry)
-
-        # Ordenamos la lista por fecha descendente (más reciente primero)
-        all_sales.sort(key=lambda x: x['sell_date'], reverse=True)
-
         # Generamos el nombre del archivo con datetime.now
         now_str = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        file_path = os.path.join(output_dir, f"ventas_historicas_{now_str}.json")
+        file_path = os.path.join(output_dir, f"ventas_historicas_{now_str}.{file_extension(output_format)}")
 
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(all_sales, f, indent=4, ensure_ascii=False)
+        with self.profiler.stage("export_sales_history"), open(file_path, 'w', encoding='utf-8') as f:
+            write_json_items(f, iter_sales_history(self.portfolio), output_format)
 
         print(f"Histórico de ventas exportado correctamente a: {file_path}")
+        return file_path
+
+    def export_period_summary(self) -> str:
+        """
+        Exporta el resultado realizado por año y mes (total y por ISIN) a partir del indice calculado en el FIFO.
+        """
+        output_dir = self.output_dir
+        os.makedirs(output_dir, exist_ok=True)
+
+        today_str = datetime.date.today().isoformat()
+        file_path = os.path.join(output_dir, f"resumen_periodos_{today_str}.json")
+
+        with self.profiler.stage("export_period_summary"), open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(self.portfolio.period_summary(), f, indent=4, ensure_ascii=False)
+
+        print(f"Resumen por periodos exportado correctamente a: {file_path}")
+        return file_path
+
+    def export_columnar(self, file_format: str = "auto") -> Dict[str, str]:
+        """
+        Exporta ventas, tramos de compra casados y lotes abiertos como tablas columnares (Parquet o CSV)
+        :param file_format: "parquet", "csv" o "auto"
+        """
+        # -- Import diferido: pandas/pyarrow solo se cargan si se escribe Parquet
+        from app.columnar import export_columnar_tables
+
+        today_str = datetime.date.today().isoformat()
+        with self.profiler.stage("export_columnar"):
+            return export_columnar_tables(self.portfolio, os.path.join(self.output_dir, f"columnar_{today_str}"), file_format)
+
+    def export_valuation(self, prices_dir: str = "data/prices", valuation_date: Optional[str] = None,
+                         start_date: Optional[str] = None) -> str:
+        """
+        Exporta la valoracion a mercado de los lotes abiertos y el valor diario de la cartera con los precios locales
+        :param prices_dir: Directorio del PriceStore
+        :param valuation_date: Fecha de valoracion (por defecto hoy)
+        :param start_date: Primer dia de la serie diaria (por defecto, el de la primera operacion)
+        """
+        # -- Import diferido: solo la valoracion necesita NumPy
+        from app.price_store import PriceStore
+
+        price_store: PriceStore = PriceStore(prices_dir)
+        output_dir = self.output_dir
+        os.makedirs(output_dir, exist_ok=True)
+
+        today_str = datetime.date.today().isoformat()
+        file_path = os.path.join(output_dir, f"valoracion_{today_str}.json")
+
+        with self.profiler.stage("export_valuation"), open(file_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "unrealized": price_store.unrealized_pnl(self.portfolio, valuation_date),
+                "daily_value": price_store.daily_value_series(self.portfolio, start_date, valuation_date)
+            }, f, indent=4, ensure_ascii=False)
+
+        print(f"Valoracion exportada correctamente a: {file_path}")
+        return file_path
+
+    def export_profile(self) -> Optional[str]:
+        """
+        Exporta el perfil de ejecucion (tiempos por etapa, contadores y pico de memoria) junto a las exportaciones
+        :return: Ruta del perfil o None si el perfilado no esta activado
+        """
+        return self.profiler.export(self.output_dir)
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Devuelve los totales del portfolio y el numero de activos, operaciones y ventas
+        """
+        actives: List[Active] = list(self.portfolio)
+        return {
+            "n_actives": len(actives),
+            "n_operations": sum(len(active.operations_list) for active in actives),
+            "n_sales": sum(len(active.sales_details) for active in actives),
+            "totals": {
+                key: sum(getattr(active, key) for active in actives)
+                for key in ("total_gross_proffit", "total_net_proffit", "total_comissions", "total_taxes")
+            }
+        }
+
+
+def extract_output_name(input_path: str) -> str:
+    """
+    Nombre del subdirectorio de salida de un extracto en el modo batch. Conserva la extension para que
+    extracto.pdf y extracto.json no escriban en el mismo directorio
+    :param input_path:
+    :return:
+    """
+    return os.path.basename(input_path).replace(".", "_")
+
+
+def run_extract_job(input_path: str, output_root: str = "data/output_data",
+                    output_format: OutputFormat = "indent") -> Dict[str, Any]:
+    """
+    Procesa un extracto del modo batch: calcula el FIFO sin imprimir el reporte y escribe sus exportaciones en
+    un subdirectorio propio de output_root
+    :param input_path:
+    :param output_root:
+    :param output_format:
+    :return: Resumen del extracto
+    """
+    output_dir: str = os.path.join(output_root, extract_output_name(input_path))
+    main = Main(input_path=input_path, output_dir=output_dir, print_report=False)
+    return {
+        **main.summary(),
+        "outputs": [main.export_to_json(output_format), main.export_sales_history(output_format),
+                    main.export_period_summary()]
+    }
 
 
 if __name__ == "__main__":
-    main = Main()
-    main.export_to_json()
-    main.export_sales_history()
+    parser = argparse.ArgumentParser(description="Calculo FIFO de los activos de un extracto de Trade Republic")
+    parser.add_argument("--input", default="data/input_data/extracto_ines.json",
+                        help="Extracto a procesar (array JSON, NDJSON o el PDF original)")
+    parser.add_argument("--output", default="data/output_data", help="Directorio de las exportaciones")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Reanuda el calculo FIFO desde el checkpoint y procesa solo las operaciones nuevas")
+    parser.add_argument("--engine", choices=["objects", "vectorized"], default="objects",
+                        help="Motor FIFO: objetos por activo o vectorizado con pandas/NumPy")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Numero de procesos para calcular el FIFO de los activos en paralelo")
+    parser.add_argument("--batch", metavar="DIR_O_PATRON",
+                        help="Procesa todos los extractos de un directorio o patron glob (en modo batch, --workers es "
+                             "el numero de extractos en paralelo)")
+    parser.add_argument("--batch-output", default="data/output_data/batch",
+                        help="Directorio de salida del modo batch (un subdirectorio por extracto y el resumen)")
+    parser.add_argument("--output-format", choices=OUTPUT_FORMATS, default="indent",
+                        help="Formato de las exportaciones: JSON indentado, JSON compacto o NDJSON")
+    parser.add_argument("--columnar", choices=["auto", "parquet", "csv"],
+                        help="Exporta ademas ventas, tramos casados y lotes abiertos como tablas columnares")
+    parser.add_argument("--cache", action="store_true",
+                        help="Reutiliza el resultado de data/cache si el extracto y las reglas no han cambiado")
+    parser.add_argument("--realized", action="store_true",
+                        help="Solo consulta el resultado realizado (filtrable con --isin y --year), calculando el FIFO "
+                             "unicamente de los activos necesarios")
+    parser.add_argument("--isin", help="ISIN para --realized")
+    parser.add_argument("--year", type=int, help="Año fiscal para --realized")
+    parser.add_argument("--report", choices=REPORT_MODES, default="console",
+                        help="Reporte FIFO: consola linea a linea, desactivado, solo totales, texto volcado de una "
+                             "vez o fichero")
+    parser.add_argument("--report-file", help="Fichero del reporte con --report file (por defecto en el directorio de salida)")
+    parser.add_argument("--import-prices", metavar="DIR_CSV",
+                        help="Importa los CSV de precios de cierre del directorio al historico local (data/prices)")
+    parser.add_argument("--valuation", action="store_true",
+                        help="Exporta la valoracion a mercado de los lotes abiertos y el valor diario de la cartera")
+    parser.add_argument("--valuation-date", help="Fecha de valoracion (YYYY-MM-DD, por defecto hoy)")
+    parser.add_argument("--serve", action="store_true",
+                        help="Arranca un servicio HTTP local que mantiene el portfolio en memoria y responde consultas "
+                             "FIFO en JSON (ver app/service.py)")
+    parser.add_argument("--host", default="127.0.0.1", help="Direccion del servicio con --serve")
+    parser.add_argument("--port", type=int, default=9001, help="Puerto del servicio con --serve")
+    parser.add_argument("--profile", action="store_true",
+                        help="Mide tiempos por etapa, contadores y pico de memoria y los exporta a perfil_*.json")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="Con --profile, mide ademas el pico de memoria de Python con tracemalloc (mas lento)")
+    parser.add_argument("--cprofile", action="store_true",
+                        help="Con --profile, vuelca ademas un perfil de cProfile (perfil_*.prof)")
+    args = parser.parse_args()
+
+    if args.import_prices:
+        from app.price_store import PriceStore
+        imported = PriceStore().import_dir(args.import_prices)
+        print(f"Precios importados: {sum(imported.values())} cierres de {len(imported)} ISIN")
+
+    if args.serve:
+        # -- Import diferido: solo el modo servicio necesita asyncio y el servidor HTTP
+        from app.service import serve
+        main = Main(lazy=True, workers=args.workers, input_path=args.input)
+        serve(main.portfolio, main.allowed_types, main.excluded_initial_isin, host=args.host, port=args.port)
+    elif args.realized:
+        main = Main(lazy=True, input_path=args.input)
+        try:
+            print(json.dumps(main.portfolio.realized(isin=args.isin, year=args.year), indent=4, ensure_ascii=False))
+        except ValueError as error:
+            parser.error(str(error))
+    elif args.batch:
+        from app.batch_runner import BatchRunner
+        batch_runner = BatchRunner(functools.partial(run_extract_job, output_root=args.batch_output,
+                                                           output_format=args.output_format), workers=args.workers)
+        batch_inputs: List[str] = BatchRunner.resolve_inputs(args.batch)
+
+        # -- Dos extractos con el mismo nombre (p.ej. a/x.json y b/x.json) escribirian en paralelo en el mismo directorio
+        inputs_by_output: Dict[str, List[str]] = {}
+        for batch_input in batch_inputs:
+            inputs_by_output.setdefault(extract_output_name(batch_input), []).append(batch_input)
+        duplicated: List[str] = [", ".join(paths) for paths in inputs_by_output.values() if len(paths) > 1]
+        if duplicated:
+            parser.error(f"extractos con el mismo directorio de salida: {'; '.join(duplicated)}")
+
+        batch_results = batch_runner.run(batch_inputs)
+        BatchRunner.export_summary(batch_results, args.batch_output)
+    else:
+        main = Main(incremental=args.incremental, engine=args.engine, workers=args.workers, use_cache=args.cache,
+                    input_path=args.input, output_dir=args.output,
+                    profile=args.profile, trace_memory=args.trace_memory, cprofile=args.cprofile,
+                    report=args.report, report_path=args.report_file)
+        main.export_to_json(args.output_format)
+        main.export_sales_history(args.output_format)
+        main.export_period_summary()
+        if args.columnar:
+            main.export_columnar(args.columnar)
+        if args.valuation:
+            main.export_valuation(valuation_date=args.valuation_date)
+        main.export_profile()